@@ -0,0 +1 @@
+"""Latency and throughput benchmarks for the weather app (see __main__.py)."""
@@ -0,0 +1,91 @@
+# benchmarks/__main__.py
+"""
+Run the benchmarks and record the results.
+
+Everything runs against the offline mock API, so no network access or
+API key is needed and runs are comparable between releases. From the
+weather_app directory::
+
+    python -m benchmarks                          # all benchmarks
+    python -m benchmarks get_weather parse        # selected ones
+    python -m benchmarks --latency 0.05           # simulate a slow network
+    python -m benchmarks startup                  # time-to-first-frame
+    python -m benchmarks --baseline benchmarks/results/baseline.json
+
+Results are written as JSON (``--output``). With ``--baseline`` the run
+exits with status 1 if any latency percentile or the throughput got
+worse than ``--threshold`` compared to the baseline file. The startup
+benchmark also exits with 1 when the p95 time-to-first-frame is over
+``--startup-budget``.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# The service reads the key from the environment; the mock accepts any key
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark-key")
+
+from config import Config  # noqa: E402
+
+from . import decode_benchmarks, service_benchmarks, startup_benchmarks  # noqa: E402,F401
+from .harness import BENCHMARKS, compare, format_table, load_results, write_results  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("-n", "--iterations", type=int, default=500, help="calls per benchmark")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="concurrent callers for request benchmarks")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock API response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random mock response time in seconds")
+    parser.add_argument("-o", "--output", type=Path, default=RESULTS_DIR / "latest.json", help="results file")
+    parser.add_argument("--baseline", type=Path, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs. baseline (0.2 = 20%%)")
+    parser.add_argument("--startup-budget", type=float, default=Config.STARTUP_BUDGET_MS, help="time-to-first-frame budget in ms")
+    return parser.parse_args(argv)
+
+
+async def run(options):
+    results = []
+    for name in options.names or BENCHMARKS:
+        results.extend(await BENCHMARKS[name](options))
+    return results
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    unknown = [name for name in options.names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}")
+        return 2
+
+    results = asyncio.run(run(options))
+    print(format_table(results))
+
+    settings = {
+        key: getattr(options, key)
+        for key in ("iterations", "concurrency", "latency", "jitter")
+    }
+    write_results(options.output, results, settings)
+    print(f"\nResults written to {options.output}")
+
+    failed = False
+    if options.baseline:
+        regressions = compare(results, load_results(options.baseline), options.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        failed = bool(regressions)
+    for result in results:
+        if result.name == "startup_first_frame" and result.p95_ms > options.startup_budget:
+            print(f"OVER BUDGET startup_first_frame p95 {result.p95_ms:.0f} ms > {options.startup_budget} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
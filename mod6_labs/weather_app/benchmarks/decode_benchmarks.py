@@ -0,0 +1,35 @@
+# benchmarks/decode_benchmarks.py
+"""JSON decoder comparison on the recorded fixture payloads."""
+
+from typing import List
+
+from json_decoding import available, get_decoder
+from mock_owm import FIXTURES_DIR
+from models import CurrentWeather, Forecast
+
+from .harness import BenchResult, benchmark, measure
+
+
+@benchmark("decode")
+async def bench_decode(options) -> List[BenchResult]:
+    """Decode only, and decode plus model building, for every installed backend."""
+    weather = (FIXTURES_DIR / "weather" / "london.json").read_bytes()
+    forecast = (FIXTURES_DIR / "forecast" / "london.json").read_bytes()
+    iterations = options.iterations * 10
+    results = []
+    for name in available():
+        loads = get_decoder(name).loads
+        results += [
+            measure(f"decode_forecast[{name}]", lambda: loads(forecast), iterations),
+            measure(
+                f"decode_parse_forecast[{name}]",
+                lambda: Forecast.from_json(loads(forecast), "metric"),
+                iterations,
+            ),
+            measure(
+                f"decode_parse_weather[{name}]",
+                lambda: CurrentWeather.from_json(loads(weather), "metric"),
+                iterations,
+            ),
+        ]
+    return results
@@ -0,0 +1,178 @@
+# benchmarks/harness.py
+"""Timing, statistics and result files for the benchmarks."""
+
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+# Metrics where a higher value is a regression (the rest: lower is worse)
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+
+# name -> benchmark(options) coroutine; filled by @benchmark
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark under name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    """Latency percentiles and throughput of one benchmark."""
+
+    name: str
+    iterations: int
+    concurrency: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    ops_per_sec: float
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linearly interpolated q-th percentile (0-100) of sorted values."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def summarize(
+    name: str,
+    latencies: List[float],
+    elapsed: float,
+    concurrency: int = 1,
+) -> BenchResult:
+    """Build a result from per-call latencies and the total wall time (seconds)."""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return BenchResult(
+        name=name,
+        iterations=count,
+        concurrency=concurrency,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        mean_ms=sum(latencies) / count * 1000 if count else 0.0,
+        ops_per_sec=count / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def measure(name: str, call: Callable[[], object], iterations: int, warmup: int = 10) -> BenchResult:
+    """Time a synchronous call."""
+    for _ in range(warmup):
+        call()
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(iterations):
+        t0 = clock()
+        call()
+        latencies.append(clock() - t0)
+    return summarize(name, latencies, clock() - start)
+
+
+async def measure_async(
+    name: str,
+    call: Callable[[], Awaitable[object]],
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 5,
+) -> BenchResult:
+    """Time a coroutine call, with `concurrency` callers sharing the iterations."""
+    for _ in range(warmup):
+        await call()
+    latencies: List[float] = []
+    clock = time.perf_counter
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = clock()
+            await call()
+            latencies.append(clock() - t0)
+
+    start = clock()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return summarize(name, latencies, clock() - start, concurrency)
+
+
+def write_results(path: Path, results: Sequence[BenchResult], settings: Dict):
+    """Save results together with the run settings and environment."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, Dict]:
+    """Results from a file written by write_results, keyed by benchmark name."""
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {result["name"]: result for result in document["results"]}
+
+
+def compare(
+    results: Sequence[BenchResult],
+    baseline: Dict[str, Dict],
+    threshold: float = 0.2,
+) -> List[str]:
+    """
+    Compare results against a baseline run.
+
+    Args:
+        results: Results of this run
+        baseline: Output of load_results for the baseline file
+        threshold: Allowed relative slowdown (0.2 = 20%)
+
+    Returns:
+        One message per metric that regressed by more than threshold
+    """
+    regressions = []
+    for result in results:
+        before = baseline.get(result.name)
+        if before is None:
+            continue
+        for metric in LOWER_IS_BETTER + ("ops_per_sec",):
+            old, new = before[metric], getattr(result, metric)
+            if not old:
+                continue
+            change = (new - old) / old
+            if metric == "ops_per_sec":
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{result.name}: {metric} {old:.3f} -> {new:.3f} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def format_table(results: Sequence[BenchResult]) -> str:
+    """Human readable summary of results."""
+    header = f"{'benchmark':<34}{'n':>7}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<34}{r.iterations:>7}{r.concurrency:>6}"
+            f"{r.p50_ms:>10.3f}{r.p95_ms:>10.3f}{r.p99_ms:>10.3f}{r.ops_per_sec:>12.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+# benchmarks/service_benchmarks.py
+"""WeatherService benchmarks against the offline mock API."""
+
+import json
+from typing import Dict, List
+
+from cache import NullCache
+from forecast_aggregation import aggregate
+from mock_owm import FIXTURES_DIR, MockOpenWeatherMap
+from models import CurrentWeather, Forecast
+from rate_limit import TokenBucket
+from weather_service import WeatherService
+
+from .harness import BenchResult, benchmark, measure, measure_async
+
+CITY_IDS = [2643743, 1850147]  # Cities with fixtures
+
+
+def make_service(options, cached: bool = True) -> WeatherService:
+    """
+    Service wired to a fresh mock API.
+
+    The rate limiter is effectively disabled so the numbers show the
+    service's own overhead instead of the API quota.
+    """
+    mock = MockOpenWeatherMap(latency=options.latency, jitter=options.jitter)
+    return WeatherService(
+        transport=mock.transport,
+        cache=None if cached else NullCache(),
+        rate_limiter=TokenBucket(10 ** 9, 10 ** 6),
+    )
+
+
+def load_fixture(endpoint: str, city: str = "london") -> Dict:
+    with open(FIXTURES_DIR / endpoint / f"{city}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@benchmark("get_weather")
+async def bench_get_weather(options) -> List[BenchResult]:
+    """Uncached current weather lookups (full request and parse)."""
+    async with make_service(options, cached=False) as service:
+        return [await measure_async(
+            "get_weather",
+            lambda: service.get_weather("London"),
+            options.iterations,
+            options.concurrency,
+        )]
+
+
+@benchmark("get_forecast")
+async def bench_get_forecast(options) -> List[BenchResult]:
+    """Uncached forecast lookups (40 slots per response)."""
+    async with make_service(options, cached=False) as service:
+        return [await measure_async(
+            "get_forecast",
+            lambda: service.get_forecast("London"),
+            options.iterations,
+            options.concurrency,
+        )]
+
+
+@benchmark("cache_hit")
+async def bench_cache_hit(options) -> List[BenchResult]:
+    """Lookups answered from the memory cache, in canonical and other units."""
+    async with make_service(options) as service:
+        await service.get_weather("London")
+        return [
+            await measure_async(
+                "cache_hit",
+                lambda: service.get_weather("London"),
+                options.iterations * 10,
+            ),
+            await measure_async(
+                "cache_hit_converted",
+                lambda: service.get_weather("London", units="imperial"),
+                options.iterations * 10,
+            ),
+        ]
+
+
+@benchmark("batch")
+async def bench_batch(options) -> List[BenchResult]:
+    """Uncached batch lookups of 20 cities, by name and by ID (group endpoint)."""
+    names = ["London", "Tokyo"] * 10
+    ids = CITY_IDS * 10
+    iterations = max(1, options.iterations // 10)
+    async with make_service(options, cached=False) as service:
+        return [
+            await measure_async(
+                "batch_by_name_20",
+                lambda: service.get_weather_many(names),
+                iterations,
+            ),
+            await measure_async(
+                "batch_by_id_20",
+                lambda: service.get_weather_many(ids),
+                iterations,
+            ),
+        ]
+
+
+@benchmark("parse")
+async def bench_parse(options) -> List[BenchResult]:
+    """JSON decoding, model building and daily aggregation, without I/O."""
+    weather_text = json.dumps(load_fixture("weather"))
+    forecast_text = json.dumps(load_fixture("forecast"))
+    forecast = Forecast.from_json(json.loads(forecast_text), "metric")
+    iterations = options.iterations * 10
+    return [
+        measure(
+            "parse_weather",
+            lambda: CurrentWeather.from_json(json.loads(weather_text), "metric"),
+            iterations,
+        ),
+        measure(
+            "parse_forecast",
+            lambda: Forecast.from_json(json.loads(forecast_text), "metric"),
+            iterations,
+        ),
+        measure("aggregate_forecast", lambda: aggregate(forecast), iterations),
+    ]
@@ -0,0 +1,82 @@
+# benchmarks/startup_benchmarks.py
+"""Time-to-first-frame of the weather app."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from .harness import BenchResult, benchmark, summarize
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: import the app, build it on a headless page
+# and report when the first frame (page.add) would be sent to the client.
+# Prints "<import seconds> <first frame seconds>" measured from process start.
+CHILD = r"""
+import time
+start = time.perf_counter()
+import asyncio, os, sys
+
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark-key")
+import main
+
+imported = time.perf_counter()
+
+
+class Window:
+    def center(self):
+        pass
+
+
+class Page:
+    window = Window()
+    platform_brightness = None
+
+    def add(self, *controls):
+        print(imported - start, time.perf_counter() - start, flush=True)
+        os._exit(0)
+
+    def update(self, *controls):
+        pass
+
+    def run_task(self, handler, *args):
+        return asyncio.ensure_future(handler(*args))
+
+
+async def run():
+    main.WeatherApp(Page())
+
+
+asyncio.run(run())
+"""
+
+
+def run_child() -> List[float]:
+    """Start the app once; returns [wall, import, first frame] in seconds."""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    wall = time.perf_counter() - start
+    imported, first_frame = (float(value) for value in output.split())
+    return [wall, imported, first_frame]
+
+
+@benchmark("startup")
+async def bench_startup(options) -> List[BenchResult]:
+    """Cold starts in fresh interpreters (wall time includes Python startup)."""
+    runs = max(3, options.iterations // 50)
+    run_child()  # Warm the OS file cache and bytecode
+    samples = [run_child() for _ in range(runs)]
+    wall, imported, first_frame = zip(*samples)
+    return [
+        summarize("startup_wall", list(wall), sum(wall)),
+        summarize("startup_import", list(imported), sum(imported)),
+        summarize("startup_first_frame", list(first_frame), sum(first_frame)),
+    ]
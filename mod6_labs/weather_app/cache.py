@@ -0,0 +1,119 @@
+# cache.py
+"""In-memory response cache for the weather service."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple, Union
+
+Location = Union[str, int, Tuple[float, float]]
+
+
+def make_key(endpoint: str, location: Location, units: str) -> Tuple:
+    """
+    Build a cache key for a weather lookup.
+
+    City names are normalized (case and whitespace) and coordinates are
+    rounded to two decimals (about 1 km), so near-identical lookups share
+    one entry.
+
+    Args:
+        endpoint: Endpoint name, e.g. "weather" or "forecast"
+        location: City name, OpenWeatherMap city ID or (lat, lon) pair
+        units: Units the response was fetched in
+
+    Returns:
+        Hashable cache key
+    """
+    if isinstance(location, tuple):
+        lat, lon = location
+        location = (round(float(lat), 2), round(float(lon), 2))
+    elif not isinstance(location, int):
+        location = " ".join(str(location).lower().split())
+    return (endpoint, location, units)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 256, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like get(), but without touching the LRU order or the counters."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """Store value under key for ttl seconds, evicting the LRU entry if full."""
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (self._clock() + ttl, value)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all cached entries (counters are kept)."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters plus the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+
+class NullCache:
+    """Cache that never stores anything; pass it to disable caching."""
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        pass
+
+    def clear(self):
+        pass
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
@@ -0,0 +1,202 @@
+# city_index.py
+"""Offline city index for instant autocomplete.
+
+The index is built from OpenWeatherMap's city list bundle
+(``current.city.list.json.gz`` from http://bulk.openweathermap.org/sample/;
+the plain ``city.list.json.gz`` works too but has no populations).
+Normalized names are kept in one sorted list, with ids and populations in
+parallel arrays, so a prefix lookup is two binary searches. Results are
+ranked by population when the bundle includes it.
+"""
+
+import bisect
+import difflib
+import gzip
+import heapq
+import json
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+# Prefix ranges larger than this are ranked by walking the
+# population-ordered list instead of scanning the whole range
+_LARGE_RANGE = 512
+
+
+def normalize(name: str) -> str:
+    """Case-fold a city name and strip accents ("São Paulo" -> "sao paulo")."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+
+@dataclass(frozen=True)
+class CitySuggestion:
+    """One autocomplete result."""
+
+    __slots__ = ("city_id", "name", "state", "country", "population")
+
+    city_id: int
+    name: str
+    state: str
+    country: str
+    population: int
+
+    @property
+    def label(self) -> str:
+        """Display name, e.g. "Portland, OR, US"."""
+        parts = [self.name, self.state, self.country]
+        return ", ".join(part for part in parts if part)
+
+
+class CityIndex:
+    """Sorted prefix index with population ranking and fuzzy fallback."""
+
+    def __init__(self, cities: Iterable[Tuple[int, str, str, str, int]]):
+        """
+        Build the index.
+
+        Args:
+            cities: (city_id, name, state, country, population) tuples
+        """
+        rows = sorted(
+            ((normalize(name), -population, city_id, name, state, country)
+             for city_id, name, state, country, population in cities),
+        )
+        self.keys: List[str] = [row[0] for row in rows]
+        self.populations = array("q", (-row[1] for row in rows))
+        self.ids = array("q", (row[2] for row in rows))
+        self.names: List[str] = [row[3] for row in rows]
+        self.states: List[str] = [row[4] for row in rows]
+        self.countries: List[str] = [row[5] for row in rows]
+        # Positions ordered by population, most populous first
+        self.by_population = array(
+            "l", sorted(range(len(rows)), key=lambda i: -self.populations[i])
+        )
+
+    @classmethod
+    def load(cls, path) -> "CityIndex":
+        """
+        Load an OpenWeatherMap city list (.json or .json.gz).
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a valid city list
+        """
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        def rows():
+            for city in raw:
+                population = city.get("population")
+                if population is None:
+                    population = city.get("stat", {}).get("population", 0)
+                yield (
+                    int(city["id"]),
+                    city["name"],
+                    city.get("state", ""),
+                    city.get("country", ""),
+                    int(population or 0),
+                )
+
+        try:
+            return cls(rows())
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid city list: {e!r}") from None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _suggestion(self, index: int) -> CitySuggestion:
+        return CitySuggestion(
+            city_id=self.ids[index],
+            name=self.names[index],
+            state=self.states[index],
+            country=self.countries[index],
+            population=self.populations[index],
+        )
+
+    def _prefix_range(self, key: str) -> Tuple[int, int]:
+        low = bisect.bisect_left(self.keys, key)
+        high = bisect.bisect_left(self.keys, key + "\U0010ffff", low)
+        return low, high
+
+    def prefix(self, text: str, limit: int = 8) -> List[CitySuggestion]:
+        """Cities whose name starts with text, most populous first."""
+        key = normalize(text)
+        if not key:
+            return []
+        low, high = self._prefix_range(key)
+        if high - low <= _LARGE_RANGE:
+            best = heapq.nlargest(
+                limit, range(low, high), key=lambda i: self.populations[i]
+            )
+        else:
+            best = []
+            for index in self.by_population:
+                if self.keys[index].startswith(key):
+                    best.append(index)
+                    if len(best) == limit:
+                        break
+        return [self._suggestion(i) for i in best]
+
+    def fuzzy(self, text: str, limit: int = 8, cutoff: float = 0.75) -> List[CitySuggestion]:
+        """
+        Close matches for a misspelled name.
+
+        Candidates share the first half of the name (most typos come later
+        in the word); if none match, the search widens to the first letter.
+        """
+        key = normalize(text)
+        if not key:
+            return []
+        results = self._fuzzy_range(key, key[:max(1, len(key) // 2)], limit, cutoff)
+        if not results and len(key) > 1:
+            results = self._fuzzy_range(key, key[0], limit, cutoff)
+        return results
+
+    def _fuzzy_range(self, key: str, prefix: str, limit: int, cutoff: float) -> List[CitySuggestion]:
+        low, high = self._prefix_range(prefix)
+        matcher = difflib.SequenceMatcher(b=key)
+        scored = []
+        for index in range(low, high):
+            candidate = self.keys[index]
+            if abs(len(candidate) - len(key)) > 2:
+                continue
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((ratio, self.populations[index], index))
+        best = heapq.nlargest(limit, scored)
+        return [self._suggestion(index) for _, _, index in best]
+
+    def search(self, text: str, limit: int = 8) -> List[CitySuggestion]:
+        """Prefix matches, or fuzzy matches when nothing starts with text."""
+        # Fuzzy matching scans many names with a shared prefix, so it
+        # only runs once the prefix search has come up empty (likely a typo)
+        return self.prefix(text, limit) or self.fuzzy(text, limit)
+
+    def resolve(self, name: str) -> Optional[int]:
+        """
+        City ID for an exact (normalized) name, or None if it is ambiguous.
+
+        A name shared by several cities resolves to the most populous one,
+        but only when the bundle's populations single it out; otherwise
+        the caller should let the API pick by name.
+        """
+        key = normalize(name)
+        index = bisect.bisect_left(self.keys, key)
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        # Ties are sorted by descending population
+        runner_up = index + 1
+        if runner_up < len(self.keys) and self.keys[runner_up] == key:
+            if self.populations[index] <= self.populations[runner_up]:
+                return None
+        return self.ids[index]
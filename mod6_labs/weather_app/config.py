@@ -2,39 +2,113 @@
 """Configuration management for the Weather App."""
 
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
 
 class Config:
-    """Application configuration."""
+    """Application configuration.
+    
+    Settings that come from the environment (or the .env file) are filled
+    in by ``load()`` on first use rather than at import time, so the app
+    can show its window before reading files or failing validation.
+    """
     
-    # API Configuration
-    API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
-    BASE_URL = os.getenv(
-        "OPENWEATHER_BASE_URL", 
-        "https://api.openweathermap.org/data/2.5/weather"
-    )
+    # API Configuration (environment values are applied by load())
+    API_KEY = ""
+    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
     
     # App Configuration
     APP_TITLE = "Weather App"
     APP_WIDTH = 750
     APP_HEIGHT = 1000
     
+    FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+    GROUP_URL = "https://api.openweathermap.org/data/2.5/group"
+    
     # API Settings
     UNITS = "metric"  # metric, imperial, or standard
     TIMEOUT = 10  # seconds
     
+    # Connection Pool Settings
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    KEEPALIVE_EXPIRY = 30  # seconds
+    HTTP2 = True
+    JSON_DECODER = "auto"  # auto, orjson, msgspec or json
+    
+    # Rate Limit and Retry Settings
+    RATE_LIMIT_PER_MINUTE = 60  # Free plan quota
+    RATE_LIMIT_BURST = 10
+    MAX_RETRIES = 3
+    RETRY_BACKOFF_BASE = 0.5  # seconds
+    RETRY_BACKOFF_MAX = 8  # seconds
+    RETRY_AFTER_MAX = 60  # longest Retry-After we are willing to wait
+    
+    # Background Refresh Settings
+    REFRESH_INTERVAL = 9 * 60  # seconds; just under CACHE_TTL_WEATHER
+    REFRESH_RATE_SHARE = 0.25  # share of the rate limit used for prefetching
+    REFRESH_MAX_CITIES = 10
+    
+    # Batch Settings
+    BATCH_MAX_CONCURRENCY = 8
+    GROUP_MAX_IDS = 20  # API limit for the group-by-id endpoint
+    
+    # Autocomplete Settings
+    # City list bundle from http://bulk.openweathermap.org/sample/ (this one
+    # carries populations, which rank suggestions and pick among same-named cities)
+    CITY_LIST_PATH = "current.city.list.json.gz"
+    AUTOCOMPLETE_DEBOUNCE = 0.15  # seconds of typing pause before suggesting
+    AUTOCOMPLETE_LIMIT = 6
+    
+    # Search History Settings
+    HISTORY_PATH = "search_history.jsonl"
+    HISTORY_LEGACY_PATH = "search_history.json"  # Imported once if present
+    HISTORY_MAX_ENTRIES = 50
+    HISTORY_COMPACT_AFTER = 200  # log lines before rewriting one per city
+    HISTORY_HALF_LIFE = 7 * 24 * 60 * 60  # seconds for a hit to count half
+    
+    # Cache Settings
+    CACHE_MAX_ENTRIES = 256
+    CACHE_TTL_WEATHER = 10 * 60  # seconds
+    CACHE_TTL_FORECAST = 3 * 60 * 60  # seconds
+    
+    # Persistent Cache Settings
+    CACHE_DB_PATH = "weather_cache.db"
+    CACHE_DB_MAX_ENTRIES = 500
+    CACHE_DB_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+    CACHE_DB_COMPACT_EVERY = 50  # writes between compactions
+    CACHE_STALE_MAX_AGE = 24 * 60 * 60  # oldest data served while revalidating
+    
+    # Startup Settings
+    STARTUP_PREFETCH_DELAY = 2  # seconds after the first frame before prefetching
+    STARTUP_BUDGET_MS = 1500  # time-to-first-frame budget for the benchmark
+    
+    _loaded = False
+    
+    @classmethod
+    def load(cls):
+        """Read the .env file and environment settings (only the first call does work)."""
+        if cls._loaded:
+            return cls
+        from dotenv import load_dotenv
+        
+        # Load environment variables from .env file
+        load_dotenv()
+        cls.API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+        cls.BASE_URL = os.getenv("OPENWEATHER_BASE_URL", cls.BASE_URL)
+        cls.FORECAST_URL = os.getenv("OPENWEATHER_FORECAST_URL", cls.FORECAST_URL)
+        cls.GROUP_URL = os.getenv("OPENWEATHER_GROUP_URL", cls.GROUP_URL)
+        cls.HTTP2 = os.getenv("OPENWEATHER_HTTP2", "true").lower() == "true"
+        cls.JSON_DECODER = os.getenv("OPENWEATHER_JSON_DECODER", cls.JSON_DECODER)
+        cls.CITY_LIST_PATH = os.getenv("OPENWEATHER_CITY_LIST", cls.CITY_LIST_PATH)
+        cls._loaded = True
+        return cls
+    
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
+        cls.load()
         if not cls.API_KEY:
             raise ValueError(
                 "OPENWEATHER_API_KEY not found. "
                 "Please create a .env file with your API key."
             )
-        return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
+        return True
\ No newline at end of file
@@ -0,0 +1,83 @@
+# conftest.py
+"""Shared pytest fixtures: an offline OpenWeatherMap and a headless page."""
+
+import asyncio
+import os
+
+import pytest
+
+# The service reads the key from the environment; the mock accepts any key
+os.environ.setdefault("OPENWEATHER_API_KEY", "test-key")
+
+from config import Config  # noqa: E402
+from mock_owm import MockOpenWeatherMap  # noqa: E402
+from rate_limit import TokenBucket  # noqa: E402
+from weather_service import WeatherService  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry immediately so error scenarios don't slow the suite down."""
+    monkeypatch.setattr(Config, "RETRY_BACKOFF_BASE", 0)
+
+
+@pytest.fixture
+def mock_api():
+    return MockOpenWeatherMap()
+
+
+@pytest.fixture
+async def service(mock_api):
+    service = WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=TokenBucket(6000, 100),
+    )
+    yield service
+    await service.aclose()
+
+
+class FakeWindow:
+    def __init__(self):
+        self.destroyed = False
+
+    def center(self):
+        pass
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class FakePage:
+    """Just enough of ft.Page to drive WeatherApp without a Flet client."""
+
+    def __init__(self):
+        self.window = FakeWindow()
+        self.controls = []
+        self.updates = 0
+        self.theme = None
+        self.dark_theme = None
+        self.theme_mode = None
+        self.platform_brightness = None
+        self.banner = None
+        self.tasks = []
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+
+    def update(self, *controls):
+        self.updates += 1
+
+    def run_task(self, handler, *args):
+        task = asyncio.ensure_future(handler(*args))
+        self.tasks.append(task)
+        return task
+
+
+@pytest.fixture
+def page():
+    return FakePage()
@@ -0,0 +1,203 @@
+# forecast_aggregation.py
+"""Aggregate 3-hourly forecast slots into daily (or shorter) buckets.
+
+Slots are grouped by the city's local time (``dt`` epoch plus the city's
+timezone offset), so "days" match the calendar where the city is. For
+each bucket the minimum, maximum and mean temperature and the total
+precipitation are computed over *all* slots, and the slot closest to the
+middle of the bucket supplies the representative condition and icon.
+
+When NumPy is installed the columns of every forecast are concatenated
+and reduced in one vectorized pass (``aggregate_many`` handles a whole
+multi-city batch at once); otherwise a pure Python loop is used. NumPy is
+imported on first use, since importing it would slow down app startup.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from models import Forecast
+
+_numpy_module = False  # Not imported yet
+
+
+def _numpy():
+    """The numpy module, or None if it isn't installed (imported once)."""
+    global _numpy_module
+    if _numpy_module is False:
+        try:
+            import numpy
+        except ImportError:  # NumPy is optional
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+DAILY = 24
+SIX_HOURLY = 6
+
+
+@dataclass(frozen=True)
+class ForecastBucket:
+    """Aggregated forecast for one local time bucket."""
+
+    __slots__ = (
+        "start", "label", "temp_min", "temp_max", "temp_mean", "precip",
+        "weather_id", "description", "icon", "count",
+    )
+
+    start: int  # Bucket start, UTC epoch seconds
+    label: str  # Local date ("YYYY-MM-DD") or date and hour for sub-day buckets
+    temp_min: float
+    temp_max: float
+    temp_mean: float
+    precip: float  # Total rain + snow in mm
+    weather_id: int
+    description: str
+    icon: str
+    count: int  # Number of 3-hour slots in the bucket
+
+
+def preload():
+    """Import NumPy ahead of the first aggregation (call it off the UI loop)."""
+    _numpy()
+
+
+def _check_bucket_hours(bucket_hours: int):
+    if bucket_hours <= 0 or 24 % bucket_hours:
+        raise ValueError("bucket_hours must divide 24 (e.g. 24, 12, 6, 3)")
+
+
+def _label(local_start: int, bucket_hours: int) -> str:
+    fmt = "%Y-%m-%d" if bucket_hours == DAILY else "%Y-%m-%d %H:%M"
+    return time.strftime(fmt, time.gmtime(local_start))
+
+
+def aggregate(forecast: Forecast, bucket_hours: int = DAILY) -> List[ForecastBucket]:
+    """
+    Aggregate one forecast into local time buckets.
+
+    Args:
+        forecast: Parsed forecast
+        bucket_hours: Bucket size in hours; must divide 24
+
+    Returns:
+        Buckets in chronological order
+    """
+    return aggregate_many([forecast], bucket_hours)[0]
+
+
+def aggregate_many(
+    forecasts: Sequence[Forecast],
+    bucket_hours: int = DAILY,
+) -> List[List[ForecastBucket]]:
+    """
+    Aggregate several forecasts in a single pass.
+
+    Args:
+        forecasts: Parsed forecasts (e.g. from a multi-city batch)
+        bucket_hours: Bucket size in hours; must divide 24
+
+    Returns:
+        One list of buckets per forecast, in input order
+    """
+    _check_bucket_hours(bucket_hours)
+    if _numpy() is not None:
+        return _aggregate_numpy(forecasts, bucket_hours)
+    return _aggregate_python(forecasts, bucket_hours)
+
+
+def _aggregate_python(forecasts, bucket_hours):
+    width = bucket_hours * 3600
+    results = []
+    for forecast in forecasts:
+        buckets = []
+        tz = forecast.timezone
+        index, total = 0, len(forecast)
+        while index < total:
+            bucket = (forecast.dt[index] + tz) // width
+            end = index
+            while end < total and (forecast.dt[end] + tz) // width == bucket:
+                end += 1
+
+            local_start = bucket * width
+            middle = local_start + width // 2
+            rep = min(
+                range(index, end),
+                key=lambda i: abs(forecast.dt[i] + tz - middle),
+            )
+            temps = forecast.temp[index:end]
+            buckets.append(ForecastBucket(
+                start=local_start - tz,
+                label=_label(local_start, bucket_hours),
+                temp_min=min(forecast.temp_min[index:end]),
+                temp_max=max(forecast.temp_max[index:end]),
+                temp_mean=sum(temps) / len(temps),
+                precip=sum(forecast.precip[index:end]),
+                weather_id=forecast.weather_id[rep],
+                description=forecast.description[rep],
+                icon=forecast.icon[rep],
+                count=end - index,
+            ))
+            index = end
+        results.append(buckets)
+    return results
+
+
+def _aggregate_numpy(forecasts, bucket_hours):
+    np = _numpy()
+    results = [[] for _ in forecasts]
+    sizes = [len(f) for f in forecasts]
+    if not sum(sizes):
+        return results
+
+    width = bucket_hours * 3600
+
+    # The forecast columns are arrays, so these are zero-copy views
+    def column(name, dtype):
+        return np.concatenate([
+            np.frombuffer(getattr(f, name), dtype=dtype) for f in forecasts if len(f)
+        ])
+
+    owner = np.repeat(np.arange(len(forecasts)), sizes)
+    offsets = np.repeat(np.array([f.timezone for f in forecasts], dtype=np.int64), sizes)
+    local = column("dt", np.int64) + offsets
+    bucket = local // width
+
+    # Slots are chronological per forecast, so each (owner, bucket) group
+    # is a contiguous run
+    boundary = np.ones(len(local), dtype=bool)
+    boundary[1:] = (owner[1:] != owner[:-1]) | (bucket[1:] != bucket[:-1])
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(local)))
+
+    temp_min = np.minimum.reduceat(column("temp_min", np.float64), starts)
+    temp_max = np.maximum.reduceat(column("temp_max", np.float64), starts)
+    temp_mean = np.add.reduceat(column("temp", np.float64), starts) / counts
+    precip = np.add.reduceat(column("precip", np.float64), starts)
+
+    # Representative slot: closest to the middle of its bucket
+    group = np.cumsum(boundary) - 1
+    distance = np.abs(local % width - width // 2)
+    representative = np.lexsort((distance, group))[starts]
+
+    weather_id = column("weather_id", np.int32)
+    descriptions = [d for f in forecasts for d in f.description]
+    icons = [i for f in forecasts for i in f.icon]
+
+    for g, first in enumerate(starts):
+        local_start = int(bucket[first]) * width
+        rep = int(representative[g])
+        results[int(owner[first])].append(ForecastBucket(
+            start=local_start - int(offsets[first]),
+            label=_label(local_start, bucket_hours),
+            temp_min=float(temp_min[g]),
+            temp_max=float(temp_max[g]),
+            temp_mean=float(temp_mean[g]),
+            precip=float(precip[g]),
+            weather_id=int(weather_id[rep]),
+            description=descriptions[rep],
+            icon=icons[rep],
+            count=int(counts[g]),
+        ))
+    return results
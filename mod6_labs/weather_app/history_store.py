@@ -0,0 +1,264 @@
+# history_store.py
+"""Append-only search history shared safely between app instances."""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from city_index import normalize
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """One searched city with its usage statistics."""
+
+    __slots__ = ("city", "city_id", "lat", "lon", "hits", "last_searched")
+
+    city: str  # As the user last entered or picked it
+    city_id: Optional[int]
+    lat: Optional[float]
+    lon: Optional[float]
+    hits: int
+    last_searched: float  # Unix timestamp
+
+    @property
+    def query(self) -> Union[str, int]:
+        """What to pass to WeatherService: the city ID when known."""
+        return self.city if self.city_id is None else self.city_id
+
+    def score(self, now: float, half_life: float) -> float:
+        """Frecency: hit count decayed by time since the last search."""
+        age = max(0.0, now - self.last_searched)
+        return self.hits * 0.5 ** (age / half_life)
+
+
+class HistoryStore:
+    """
+    Search history kept as an append-only JSON-lines log.
+
+    Each search appends one short line, so a crash can at most lose a
+    partial last line (which ``load()`` skips) and instances running at
+    the same time add to the log instead of overwriting each other.
+    Appends and compaction hold an exclusive lock on a sidecar
+    ``.lock`` file. Once the log grows past ``compact_after`` lines it is
+    rewritten as one line per city into a temporary file that atomically
+    replaces the log.
+
+    Entries are keyed by city ID when the API reported one, so "london"
+    and "London" count as the same city. A plain ``search_history.json``
+    list from older versions is imported on first load.
+
+    Methods are blocking; the app calls them through ``asyncio.to_thread``.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.HISTORY_PATH,
+        max_entries: int = Config.HISTORY_MAX_ENTRIES,
+        compact_after: int = Config.HISTORY_COMPACT_AFTER,
+        legacy_path: Optional[str] = Config.HISTORY_LEGACY_PATH,
+        clock=time.time,
+    ):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.max_entries = max_entries
+        self.compact_after = compact_after
+        self._clock = clock
+        self._entries: Dict[Union[str, int], HistoryEntry] = {}
+        self._lines = 0  # Lines currently in the log
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock shared with other app instances."""
+        with open(self.lock_path, "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _key(city: str, city_id: Optional[int]) -> Union[str, int]:
+        return normalize(city) if city_id is None else city_id
+
+    def _apply(self, entries: Dict, record: Dict):
+        """Fold one log record into entries."""
+        city = record["city"]
+        city_id = record.get("id")
+        key = self._key(city, city_id)
+        previous = [entries.pop(key, None)]
+        if city_id is not None:
+            # Absorb hits recorded by name before the ID was known
+            previous.append(entries.pop(normalize(city), None))
+        hits = int(record.get("hits", 1))
+        lat, lon = record.get("lat"), record.get("lon")
+        for entry in filter(None, previous):
+            hits += entry.hits
+            if lat is None:
+                lat, lon = entry.lat, entry.lon
+        entries[key] = HistoryEntry(
+            city=city,
+            city_id=city_id,
+            lat=lat,
+            lon=lon,
+            hits=hits,
+            last_searched=float(record["ts"]),
+        )
+
+    def _read_log(self):
+        """Parse the log into (entries, line count), skipping damaged lines."""
+        entries: Dict = {}
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    self._apply(entries, json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue  # Torn write or hand-edited line
+        return entries, lines
+
+    def _read_legacy(self) -> Dict:
+        """Import the plain list written by older versions, newest first."""
+        entries: Dict = {}
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                cities = json.load(f)
+        except (OSError, ValueError):
+            return entries
+        if not isinstance(cities, list):
+            return entries
+        now = self._clock()
+        for age, city in reversed(list(enumerate(cities))):
+            if isinstance(city, str) and city:
+                self._apply(entries, {"city": city, "ts": now - age})
+        return entries
+
+    def _trim(self, entries: Dict) -> Dict:
+        """Keep the max_entries most recently searched cities."""
+        if len(entries) <= self.max_entries:
+            return entries
+        newest = sorted(
+            entries.items(), key=lambda item: item[1].last_searched, reverse=True
+        )
+        return dict(newest[:self.max_entries])
+
+    def load(self) -> List[HistoryEntry]:
+        """
+        Read the history from disk.
+
+        Returns:
+            Entries ranked for suggestions (see ``ranked()``)
+        """
+        with self._lock:
+            migrated = False
+            try:
+                entries, lines = self._read_log()
+            except FileNotFoundError:
+                entries, lines = {}, 0
+                if self.legacy_path is not None and self.legacy_path.exists():
+                    entries = self._read_legacy()
+                    migrated = bool(entries)
+            except OSError as e:
+                logger.warning("Could not read search history: %s", e)
+                entries, lines = {}, 0
+            self._entries = self._trim(entries)
+            self._lines = lines
+        if migrated or lines > self.compact_after:
+            self.compact()
+        return self.ranked()
+
+    def record(
+        self,
+        city: str,
+        city_id: Optional[int] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+    ) -> HistoryEntry:
+        """Count one search for city and append it to the log."""
+        record = {"city": city, "id": city_id, "lat": lat, "lon": lon,
+                  "ts": self._clock()}
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._apply(self._entries, record)
+            self._entries = self._trim(self._entries)
+            entry = self._entries[self._key(city, city_id)]
+            with self._file_lock():
+                # One short write in append mode never interleaves with others
+                with open(self.path, "a+b") as f:
+                    if f.seek(0, os.SEEK_END) > 0:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            # Finish a line torn by a crash so this record
+                            # doesn't get glued onto it and skipped as well
+                            line = b"\n" + line
+                    f.write(line)
+            self._lines += 1
+            needs_compaction = self._lines > self.compact_after
+        if needs_compaction:
+            self.compact()
+        return entry
+
+    def compact(self):
+        """Rewrite the log as one line per city, replacing it atomically."""
+        with self._lock, self._file_lock():
+            try:
+                # Re-read so appends from other instances are kept
+                entries, _ = self._read_log()
+            except FileNotFoundError:
+                entries = dict(self._entries)
+            entries = self._trim(entries)
+
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in sorted(entries.values(), key=lambda e: e.last_searched):
+                    f.write(json.dumps({
+                        "city": entry.city,
+                        "id": entry.city_id,
+                        "lat": entry.lat,
+                        "lon": entry.lon,
+                        "hits": entry.hits,
+                        "ts": entry.last_searched,
+                    }, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._entries = entries
+            self._lines = len(entries)
+
+    def ranked(self, limit: Optional[int] = None) -> List[HistoryEntry]:
+        """Entries ordered by frecency (frequent and recent cities first)."""
+        now = self._clock()
+        half_life = Config.HISTORY_HALF_LIFE
+        with self._lock:
+            entries = list(self._entries.values())
+        entries.sort(key=lambda e: (e.score(now, half_life), e.last_searched), reverse=True)
+        return entries[:limit]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,101 @@
+# json_decoding.py
+"""Pluggable JSON decoding for API responses.
+
+Responses are decoded straight from the body bytes, skipping the text
+decoding step of ``response.json()``. The fastest installed backend is
+used: orjson, then msgspec, then the standard library. Set
+``OPENWEATHER_JSON_DECODER`` (or pass a name to ``get_decoder``) to pick
+one explicitly. The decoded payload is validated while it is parsed into
+the typed models (``CurrentWeather.from_json`` / ``Forecast.from_json``).
+"""
+
+import json
+from typing import Any, Callable, Dict, List
+
+# Tried in this order by get_decoder("auto")
+PREFERENCE = ("orjson", "msgspec", "json")
+
+
+class JSONDecoder:
+    """A named bytes-to-object decoder that raises ValueError on bad input."""
+
+    def __init__(self, name: str, loads: Callable[[bytes], Any], error: type):
+        self.name = name
+        self._loads = loads
+        self._error = error
+
+    def loads(self, content: bytes) -> Any:
+        """
+        Decode a JSON document.
+
+        Raises:
+            ValueError: If content is not valid JSON
+        """
+        try:
+            return self._loads(content)
+        except self._error as e:
+            raise ValueError(f"Invalid JSON: {e}") from None
+
+    def __repr__(self) -> str:
+        return f"JSONDecoder({self.name!r})"
+
+
+def _orjson() -> JSONDecoder:
+    import orjson
+
+    return JSONDecoder("orjson", orjson.loads, orjson.JSONDecodeError)
+
+
+def _msgspec() -> JSONDecoder:
+    import msgspec
+
+    return JSONDecoder("msgspec", msgspec.json.Decoder().decode, msgspec.DecodeError)
+
+
+def _stdlib() -> JSONDecoder:
+    # json.loads detects the encoding of bytes input itself
+    return JSONDecoder("json", json.loads, ValueError)
+
+
+_BACKENDS: Dict[str, Callable[[], JSONDecoder]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+
+def available() -> List[str]:
+    """Names of the backends that can be imported, fastest first."""
+    names = []
+    for name in PREFERENCE:
+        try:
+            _BACKENDS[name]()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_decoder(name: str = "auto") -> JSONDecoder:
+    """
+    Create a decoder.
+
+    Args:
+        name: "orjson", "msgspec", "json", or "auto" for the fastest installed
+
+    Raises:
+        ValueError: If name is not a known backend
+        ImportError: If the requested backend is not installed
+    """
+    if name == "auto":
+        for candidate in PREFERENCE:
+            try:
+                return _BACKENDS[candidate]()
+            except ImportError:
+                continue
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"Unknown JSON decoder {name!r}; "
+            f"expected one of: auto, {', '.join(PREFERENCE)}"
+        )
+    return _BACKENDS[name]()
@@ -1,59 +1,182 @@
 """Weather Application using Flet v0.28.3"""
 
 import flet as ft
-import json
-import httpx
 import asyncio
+import logging
+import time
 from pathlib import Path
-from weather_service import WeatherService
+from typing import TYPE_CHECKING, Optional, Union
 from config import Config
+from city_index import CityIndex, CitySuggestion, normalize
+from history_store import HistoryEntry, HistoryStore
+from metrics import REGISTRY, MetricsRegistry
+from forecast_aggregation import aggregate, preload
+from models import CurrentWeather, Forecast
+from theme import (
+    ACCENT,
+    BORDER,
+    DIVIDER,
+    ERROR,
+    MUTED_TEXT,
+    PANEL,
+    SURFACE,
+    apply_theme,
+    is_dark,
+    tint,
+    toggle_theme_mode,
+)
+from units import convert_temperature, temperature_symbol
+from weather_view import CurrentWeatherView, ForecastView
+
+if TYPE_CHECKING:
+    from weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
 
 
 class WeatherApp:
     """Main Weather Application class."""
     
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, weather_service: Optional["WeatherService"] = None):
         self.page = page
-        self.weather_service = WeatherService()
-        self.history_file = Path("search_history.json")
-        self.search_history = self.load_history()
-        self.current_unit = "metric"
-        self.current_weather_data = None
+        # Created on first use, so startup doesn't wait for it
+        self._weather_service = weather_service
+        self.metrics: MetricsRegistry = (
+            weather_service.metrics if weather_service is not None else REGISTRY
+        )
+        self._debug_future = None
+        self.history = HistoryStore()
+        self.search_history = []  # HistoryEntry list, best suggestions first
+        self.current_unit = Config.UNITS
+        self.current_weather_data = None  # Canonical units (Config.UNITS)
+        self.current_forecast_data = None
+        self._search_future = None
+        self._search_id = 0
+        self.suggestion_temps = {}  # city -> Text showing its live temperature
+        self.city_index = None  # Loaded in the background; None until then
+        self._suggest_future = None
+        self._selected_city = None  # (label, city ID) picked from suggestions
+        self.refresh_scheduler = None
+        self._refresh_future = None
         self.setup_page()
         self.build_ui()
+        # Everything else happens after the first frame is on screen
+        self.page.run_task(self.startup)
+        self.page.run_task(self.load_city_index)
     
-    def load_history(self):
-        """Load search history from file."""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    def save_history(self):
-        """Save search history to file."""
-        with open(self.history_file, 'w') as f:
-            json.dump(self.search_history, f)
-    
-    def add_to_history(self, city: str):
-        """Add city to history."""
-        if city not in self.search_history:
-            self.search_history.insert(0, city)
-            self.search_history = self.search_history[:10]
-            self.save_history()
+    @property
+    def weather_service(self) -> "WeatherService":
+        """
+        The weather service, imported and created on first use.
+        
+        Raises:
+            ValueError: If the configuration is invalid (e.g. no API key)
+        """
+        if self._weather_service is None:
+            Config.validate()
+            from weather_service import WeatherService
+            from weather_store import WeatherStore
+            
+            self._weather_service = WeatherService(
+                store=WeatherStore(Config.CACHE_DB_PATH)
+            )
+        return self._weather_service
+    
+    async def startup(self):
+        """Background startup work: history, warm-up, then prefetching."""
+        await self.load_history()
+        await asyncio.sleep(Config.STARTUP_PREFETCH_DELAY)
+        await asyncio.to_thread(preload)
+        self.start_refresh()
+    
+    async def load_history(self):
+        """Load search history off the event loop."""
+        try:
+            self.search_history = await asyncio.to_thread(self.history.load)
+        except OSError as e:
+            logger.warning("Could not load search history: %s", e)
+    
+    def start_refresh(self):
+        """Start prefetching weather for history cities in the background."""
+        try:
+            service = self.weather_service
+        except ValueError:
+            return  # Searches report the configuration error
+        from refresh_scheduler import RefreshScheduler
+        
+        self.refresh_scheduler = RefreshScheduler(
+            service,
+            lambda: [
+                entry.query
+                for entry in self.search_history[:Config.REFRESH_MAX_CITIES]
+            ],
+            on_refresh=self.on_city_refreshed,
+        )
+        self._refresh_future = self.page.run_task(self.refresh_scheduler.run)
+    
+    async def load_city_index(self):
+        """Load the offline city list off the event loop (optional)."""
+        path = Path(Config.load().CITY_LIST_PATH)
+        if not path.exists():
+            return
+        try:
+            self.city_index = await asyncio.to_thread(CityIndex.load, path)
+        except (OSError, ValueError) as e:
+            logger.warning("City list unavailable, autocomplete uses history only: %s", e)
+    
+    async def add_to_history(self, city: str, weather: CurrentWeather):
+        """Record a successful search (appended off the event loop)."""
+        try:
+            await asyncio.to_thread(
+                self.history.record,
+                city,
+                weather.city_id,
+                weather.lat,
+                weather.lon,
+            )
+        except OSError as e:
+            logger.warning("Could not save search history: %s", e)
+            return
+        self.search_history = self.history.ranked()
     
     def setup_page(self):
         """Configure page settings."""
         self.page.title = Config.APP_TITLE
-        self.page.theme_mode = ft.ThemeMode.SYSTEM
-        self.page.theme = ft.Theme(color_scheme_seed=ft.Colors.BLUE)
+        apply_theme(self.page, seed=ft.Colors.BLUE, mode=ft.ThemeMode.SYSTEM)
         self.page.padding = 20
         self.page.window.width = Config.APP_WIDTH
         self.page.window.height = Config.APP_HEIGHT
         self.page.window.resizable = False
         self.page.window.center()
+        # Hold the desktop window open until the HTTP client is closed
+        self.page.window.prevent_close = True
+        self.page.window.on_event = self.on_window_event
+        self.page.on_close = self.on_close
+        self.page.on_keyboard_event = self.on_keyboard
+    
+    def update_page(self):
+        """page.update(), timed for the metrics registry."""
+        with self.metrics.span("page_update"):
+            self.page.update()
+    
+    async def shutdown(self):
+        """Stop background refreshes and release pooled HTTP connections."""
+        if self._refresh_future is not None:
+            self._refresh_future.cancel()
+        if self._debug_future is not None:
+            self._debug_future.cancel()
+        if self._weather_service is not None:
+            await self._weather_service.aclose()
+
+    async def on_window_event(self, e):
+        """Shut down cleanly before the desktop window closes."""
+        if e.type == ft.WindowEventType.CLOSE:
+            await self.shutdown()
+            self.page.window.destroy()
+
+    def on_close(self, e):
+        """Web sessions have no window: shut down when the session expires."""
+        self.page.run_task(self.shutdown)
     
     def build_ui(self):
         """Build the user interface."""
@@ -62,13 +185,13 @@ class WeatherApp:
             "Weather App",
             size=45,
             weight=ft.FontWeight.BOLD,
-            color=ft.Colors.BLUE_700,
+            color=ACCENT,
             text_align=ft.TextAlign.CENTER,
         )
         
         # Theme toggle button
         self.theme_button = ft.IconButton(
-            icon=ft.Icons.DARK_MODE,
+            icon=ft.Icons.LIGHT_MODE if is_dark(self.page) else ft.Icons.DARK_MODE,
             tooltip="Toggle theme",
             on_click=self.toggle_theme,
         )
@@ -84,13 +207,14 @@ class WeatherApp:
         self.city_input = ft.TextField(
             label="Enter city name",
             hint_text="e.g., London, Tokyo, New York",
-            border_color=ft.Colors.BLACK,
+            border_color=BORDER,
             prefix_icon=ft.Icons.LOCATION_CITY,
             autofocus=False,
             on_submit=self.on_search,
+            on_change=self.on_input_change,
             on_focus=self.show_history_suggestions,
             on_blur=self.hide_history_suggestions,
-            fill_color=ft.Colors.GREY_300,
+            fill_color=PANEL,
             filled=True,
         )
         
@@ -140,32 +264,75 @@ class WeatherApp:
             width=180,
         )
         
+        # Weather and forecast views (built once, patched on each render)
+        self.weather_view = CurrentWeatherView()
+        self.forecast_view = ForecastView()
+        
         # Weather display container
         self.weather_container = ft.Container(
+            content=self.weather_view.content,
             visible=False,
-            bgcolor=ft.Colors.BLUE_50,
+            bgcolor=PANEL,
             border_radius=10,
             padding=20,
+            opacity=0,
+            animate_opacity=300,
         )
         
         # Forecast container
         self.forecast_container = ft.Container(
+            content=self.forecast_view.content,
             visible=False,
-            bgcolor=ft.Colors.BLUE_50,
+            bgcolor=PANEL,
             border_radius=10,
             padding=20,
+            opacity=0,
+            animate_opacity=300,
         )
         
         # Error message
         self.error_message = ft.Text(
             "",
-            color=ft.Colors.RED_700,
+            color=ERROR,
             visible=False,
         )
         
         # Loading indicator
         self.loading = ft.ProgressRing(visible=False)
         
+        # Debug panel with recent timings (hidden; Ctrl+Shift+D toggles it)
+        self.debug_text = ft.Text(
+            "",
+            size=11,
+            font_family="monospace",
+            selectable=True,
+            color=MUTED_TEXT,
+        )
+        self.debug_panel = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Text("Timings", weight=ft.FontWeight.BOLD),
+                            ft.TextButton(
+                                "Copy Prometheus metrics",
+                                icon=ft.Icons.CONTENT_COPY,
+                                on_click=self.copy_metrics,
+                            ),
+                        ],
+                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                    ),
+                    self.debug_text,
+                ],
+                spacing=5,
+            ),
+            visible=False,
+            bgcolor=PANEL,
+            border=ft.border.all(1, BORDER),
+            border_radius=10,
+            padding=10,
+        )
+        
         # Add all components to page
         self.page.add(
             ft.Container(
@@ -201,6 +368,7 @@ class WeatherApp:
                     self.error_message,
                     self.weather_container,
                     self.forecast_container,
+                    self.debug_panel,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=10,
@@ -212,116 +380,257 @@ class WeatherApp:
     
     def on_search(self, e):
         """Handle search button click or enter key press."""
-        self.page.run_task(self.get_weather)
+        self.start_search()
+    
+    def start_search(self):
+        """Start a search, cancelling any search still in flight."""
+        if self._search_future is not None and not self._search_future.done():
+            self._search_future.cancel()
+        self._search_future = self.page.run_task(self.get_weather)
     
     def load_from_history(self, e):
         """Load weather from history."""
         city = e.control.value
         if city:
             self.city_input.value = city
-            self.page.run_task(self.get_weather)
+            self.start_search()
     
     async def get_weather(self):
         """Fetch and display weather data."""
+        # Imported here so startup doesn't load the service layer
+        from weather_service import WeatherServiceError
+        
         city = self.city_input.value.strip()
         
         if not city:
             self.show_error("Please enter a city name")
             return
         
+        # A city picked from autocomplete is queried by its unambiguous ID
+        query = city
+        if self._selected_city is not None and city == self._selected_city[0]:
+            query = self._selected_city[1]
+        elif self.city_index is not None:
+            # So is a typed name the index can pin down; ambiguous names
+            # go out as q= and OpenWeatherMap picks
+            query = self.city_index.resolve(city) or city
+        
+        # Only the latest search may render its results
+        self._search_id += 1
+        search_id = self._search_id
+        started = time.perf_counter()
+        
+        # Fade out the previous results while loading
         self.loading.visible = True
         self.error_message.visible = False
-        self.weather_container.visible = False
-        self.forecast_container.visible = False
-        self.page.update()
+        self.weather_container.opacity = 0
+        self.forecast_container.opacity = 0
+        self.update_page()
         
         try:
-            # Fetch weather data
-            weather_data = await self.weather_service.get_weather(city)
+            # Fetch weather and forecast concurrently
+            weather_task, forecast_task = self.weather_service.start_bundle(query)
+            try:
+                weather_data = await weather_task
+            except BaseException:
+                forecast_task.cancel()
+                raise
+            if search_id != self._search_id:
+                forecast_task.cancel()
+                return
             self.current_weather_data = weather_data
+            self.current_forecast_data = None
             
-            # Fetch forecast data
-            forecast_data = await self.weather_service.get_forecast(city)
-            
-            # Display weather and forecast
-            await self.display_weather(weather_data)
-            self.display_forecast(forecast_data)
+            # Show current conditions without waiting for the forecast
+            self.display_weather(weather_data.to_units(self.current_unit))
+            self.update_page()
+            self.metrics.observe("search", time.perf_counter() - started, stage="weather")
             
             # Add to history
-            self.add_to_history(city)
+            await self.add_to_history(city, weather_data)
+            
+            # Stream in the forecast; its failure keeps current weather visible
+            try:
+                forecast_data = await forecast_task
+                if search_id == self._search_id:
+                    self.current_forecast_data = forecast_data
+                    self.display_forecast(forecast_data.to_units(self.current_unit))
+            except WeatherServiceError as e:
+                if search_id == self._search_id:
+                    self.show_forecast_error(str(e))
+            if search_id == self._search_id:
+                self.loading.visible = False
+                self.update_page()
+                self.metrics.observe("search", time.perf_counter() - started, stage="forecast")
             
         except Exception as e:
-            self.show_error(str(e))
+            if search_id == self._search_id:
+                self.show_error(str(e))
         
         finally:
-            self.loading.visible = False
-            self.page.update()
+            if search_id == self._search_id and self.loading.visible:
+                self.loading.visible = False
+                self.update_page()
     
     async def get_current_location_weather(self):
         """Get weather for current location using IP."""
         self.loading.visible = True
-        self.page.update()
+        self.update_page()
         
         try:
-            async with httpx.AsyncClient() as client:
-                # Get location from IP
-                response = await client.get("https://ipapi.co/json/")
-                data = response.json()
-                city = data.get('city', '')
-                
-                if city:
-                    self.city_input.value = city
-                    await self.get_weather()
-                else:
-                    self.show_error("Could not detect your location")
+            # Get location from IP (reuses the service's pooled client)
+            response = await self.weather_service.client.get("https://ipapi.co/json/")
+            data = response.json()
+            city = data.get('city', '')
+            
+            if city:
+                self.city_input.value = city
+                await self.get_weather()
+            else:
+                self.show_error("Could not detect your location")
         except Exception as e:
             self.show_error("Could not detect your location")
         finally:
             self.loading.visible = False
-            self.page.update()
+            self.update_page()
     
     def show_history_suggestions(self, e):
-        """Show search history when input is focused."""
-        if len(self.search_history) > 0:
-            # Build suggestion items
-            suggestion_items = []
-            # Add history items
-            for city in self.search_history[:5]:  # Show last 5
-                # Create a simple container that definitely captures clicks
-                item = ft.Container(
-                    content=ft.Row(
-                        [
-                            ft.Icon(ft.Icons.HISTORY, size=16, color=ft.Colors.GREY_600),
-                            ft.Text(city, size=14),
-                        ],
-                        spacing=10,
-                    ),
-                    padding=10,
-                    bgcolor=ft.Colors.WHITE,
-                    border=ft.border.only(bottom=ft.border.BorderSide(1, ft.Colors.GREY_300)),
-                    on_click=lambda e, c=city: self.handle_history_click(c),
-                    ink=True,
+        """Show suggestions when input is focused."""
+        self.show_suggestions(self.city_input.value or "")
+    
+    def on_input_change(self, e):
+        """Refresh suggestions once typing pauses (debounced)."""
+        selected = self._selected_city
+        if selected is not None and self.city_input.value != selected[0]:
+            self._selected_city = None
+        if self._suggest_future is not None and not self._suggest_future.done():
+            self._suggest_future.cancel()
+        self._suggest_future = self.page.run_task(self.debounced_suggestions)
+    
+    async def debounced_suggestions(self):
+        """Wait out the debounce delay, then show suggestions for the input."""
+        await asyncio.sleep(Config.AUTOCOMPLETE_DEBOUNCE)
+        self.show_suggestions(self.city_input.value or "")
+    
+    def show_suggestions(self, text: str):
+        """Show matching history entries followed by offline city matches."""
+        key = normalize(text)
+        history = [
+            entry for entry in self.search_history
+            if normalize(entry.city).startswith(key)
+        ][:5]  # Show top 5 by frequency and recency
+        
+        matches = []
+        if key and self.city_index is not None:
+            shown = {entry.city_id for entry in history}
+            shown.update(normalize(entry.city) for entry in history)
+            matches = [
+                suggestion
+                for suggestion in self.city_index.search(text, Config.AUTOCOMPLETE_LIMIT)
+                if suggestion.city_id not in shown
+                and normalize(suggestion.label) not in shown
+            ]
+        
+        if not history and not matches:
+            if self.history_suggestions.visible:
+                self.history_suggestions.visible = False
+                self.update_page()
+            return
+        
+        # Build suggestion items
+        suggestion_items = []
+        # Add history items
+        self.suggestion_temps = {}
+        for entry in history:
+            # Live temperature from the prefetched cache (no I/O)
+            temp_text = ft.Text(
+                self.format_cached_temp(entry.query),
+                size=14,
+                color=MUTED_TEXT,
+            )
+            self.suggestion_temps[entry.query] = temp_text
+            suggestion_items.append(
+                self.build_suggestion_item(
+                    ft.Icons.HISTORY,
+                    entry.city,
+                    temp_text,
+                    lambda e, h=entry: self.handle_history_click(h),
                 )
-                suggestion_items.append(item)
-            
-            self.history_suggestions.controls = suggestion_items
-            self.history_suggestions.visible = True
-            self.page.update()
+            )
+        
+        # Add city index matches
+        for suggestion in matches:
+            suggestion_items.append(
+                self.build_suggestion_item(
+                    ft.Icons.LOCATION_CITY,
+                    suggestion.label,
+                    None,
+                    lambda e, s=suggestion: self.handle_suggestion_click(s),
+                )
+            )
+        
+        self.history_suggestions.controls = suggestion_items
+        self.history_suggestions.visible = True
+        self.update_page()
+    
+    def build_suggestion_item(self, icon, text: str, trailing, on_click):
+        """Create one clickable suggestion row."""
+        controls = [
+            ft.Icon(icon, size=16, color=MUTED_TEXT),
+            ft.Text(text, size=14, expand=True),
+        ]
+        if trailing is not None:
+            controls.append(trailing)
+        
+        # Create a simple container that definitely captures clicks
+        return ft.Container(
+            content=ft.Row(controls, spacing=10),
+            padding=10,
+            bgcolor=SURFACE,
+            border=ft.border.only(bottom=ft.border.BorderSide(1, DIVIDER)),
+            on_click=on_click,
+            ink=True,
+        )
 
-    def handle_history_click(self, city: str):
+    def format_cached_temp(self, city: Union[str, int]) -> str:
+        """Cached temperature for a city in the current unit, or "" if unknown."""
+        if self._weather_service is None:
+            return ""
+        weather = self._weather_service.peek_weather(city, self.current_unit)
+        if weather is None:
+            return ""
+        return f"{weather.temp:.0f}{temperature_symbol(self.current_unit)}"
+    
+    def on_city_refreshed(self, city: Union[str, int], weather: CurrentWeather):
+        """Update a visible suggestion when its city is refreshed in the background."""
+        temp_text = self.suggestion_temps.get(city)
+        if temp_text is not None and self.history_suggestions.visible:
+            temp_text.value = self.format_cached_temp(city)
+            self.update_page()
+    
+    def handle_history_click(self, entry: HistoryEntry):
         """Handle click on history item."""
-        print(f"HISTORY CLICKED: {city}")
-        self.city_input.value = city
+        if entry.city_id is not None:
+            self._selected_city = (entry.city, entry.city_id)
+        self.city_input.value = entry.city
+        self.history_suggestions.visible = False
+        self.update_page()
+        self.start_search()
+
+    def handle_suggestion_click(self, suggestion: CitySuggestion):
+        """Search for a city picked from the offline index by its ID."""
+        self._selected_city = (suggestion.label, suggestion.city_id)
+        self.city_input.value = suggestion.label
         self.history_suggestions.visible = False
-        self.page.update()
-        self.page.run_task(self.get_weather)
+        self.update_page()
+        self.start_search()
 
     def hide_history_suggestions(self, e): 
         """Hide suggestions when input loses focus.""" 
         async def delayed_hide():
             await asyncio.sleep(0.3)
             self.history_suggestions.visible = False
-            self.page.update()
+            self.update_page()
         
         self.page.run_task(delayed_hide)
 
@@ -329,223 +638,68 @@ class WeatherApp:
         """Select a city from history suggestions."""
         self.city_input.value = city
         self.history_suggestions.visible = False
-        self.page.update()
-        self.page.run_task(self.get_weather)
+        self.update_page()
+        self.start_search()
 
     def get_weather_color(self, weather_id: int) -> str:
-        """Get background color based on weather condition."""
+        """Get background tint based on weather condition (works in both themes)."""
         # Weather condition codes: https://openweathermap.org/weather-conditions
         if 200 <= weather_id < 300:  # Thunderstorm
-            return ft.Colors.PURPLE_100
+            return tint(ft.Colors.PURPLE)
         elif 300 <= weather_id < 600:  # Drizzle/Rain
-            return ft.Colors.BLUE_100
+            return tint(ft.Colors.BLUE)
         elif 600 <= weather_id < 700:  # Snow
-            return ft.Colors.LIGHT_BLUE_50
+            return tint(ft.Colors.LIGHT_BLUE, 0.15)
         elif 700 <= weather_id < 800:  # Atmosphere (fog, mist, etc.)
-            return ft.Colors.GREY_200
+            return tint(ft.Colors.GREY)
         elif weather_id == 800:  # Clear
-            return ft.Colors.AMBER_100
+            return tint(ft.Colors.AMBER)
         elif weather_id > 800:  # Clouds
-            return ft.Colors.GREY_100
-        return ft.Colors.BLUE_50
-    
-    async def display_weather(self, data: dict):
-        """Display weather information."""
-        # Extract data
-        city_name = data.get("name", "Unknown")
-        country = data.get("sys", {}).get("country", "")
-        temp = data.get("main", {}).get("temp", 0)
-        feels_like = data.get("main", {}).get("feels_like", 0)
-        humidity = data.get("main", {}).get("humidity", 0)
-        description = data.get("weather", [{}])[0].get("description", "").title()
-        icon_code = data.get("weather", [{}])[0].get("icon", "01d")
-        weather_id = data.get("weather", [{}])[0].get("id", 800)
-        wind_speed = data.get("wind", {}).get("speed", 0)
-        
-        # Get color based on weather
-        bg_color = self.get_weather_color(weather_id)
-        
-        # Build weather display
-        self.weather_container.content = ft.Column(
-            [
-                ft.Text(
-                    f"{city_name}, {country}",
-                    size=24,
-                    weight=ft.FontWeight.BOLD,
-                ),
-                ft.Row(
-                    [
-                        ft.Image(
-                            src=f"https://openweathermap.org/img/wn/{icon_code}@2x.png",
-                            width=100,
-                            height=100,
-                        ),
-                        ft.Text(
-                            description,
-                            size=20,
-                            italic=True,
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.CENTER,
-                ),
-                ft.Text(
-                    f"{temp:.1f}°{'C' if self.current_unit == 'metric' else 'F'}",
-                    size=48,
-                    weight=ft.FontWeight.BOLD,
-                    color=ft.Colors.BLUE_900,
-                ),
-                ft.Text(
-                    f"Feels like {feels_like:.1f}°{'C' if self.current_unit == 'metric' else 'F'}",
-                    size=16,
-                    color=ft.Colors.GREY_700,
-                ),
-                ft.Divider(),
-                ft.Row(
-                    [
-                        self.create_info_card(
-                            ft.Icons.WATER_DROP,
-                            "Humidity",
-                            f"{humidity}%"
-                        ),
-                        self.create_info_card(
-                            ft.Icons.AIR,
-                            "Wind Speed",
-                            f"{wind_speed} m/s"
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_EVENLY,
-                ),
-            ],
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=10,
-        )
-        
-        # Update container color
-        self.weather_container.bgcolor = bg_color
-        self.weather_container.animate_opacity = 300
-        self.weather_container.opacity = 0
-        self.weather_container.visible = True
-        self.error_message.visible = False
-        self.page.update()
-        
-        await asyncio.sleep(0.1)
-        self.weather_container.opacity = 1
-        self.page.update()
-        
-        # Show weather alerts
-        self.show_weather_alerts(temp)
+            return tint(ft.Colors.GREY, 0.15)
+        return PANEL
     
-    def display_forecast(self, data: dict):
-        """Display 5-day forecast."""
-        forecast_list = data.get("list", [])
-        
-        # Group by day (take one forecast per day at noon)
-        daily_forecasts = []
-        seen_dates = set()
-        
-        for item in forecast_list:
-            date = item.get("dt_txt", "").split()[0]
-            time = item.get("dt_txt", "").split()[1] if len(item.get("dt_txt", "").split()) > 1 else ""
+    def display_weather(self, data: CurrentWeather):
+        """Display weather information (the caller issues page.update())."""
+        with self.metrics.span("render", view="weather"):
+            self.weather_view.render(data, self.current_unit)
             
-            # Take forecast around noon (12:00:00)
-            if date not in seen_dates and "12:00:00" in time:
-                daily_forecasts.append(item)
-                seen_dates.add(date)
+            # Update container color
+            self.weather_container.bgcolor = self.get_weather_color(data.weather_id)
+            self.weather_container.opacity = 1
+            self.weather_container.visible = True
+            self.error_message.visible = False
             
-            if len(daily_forecasts) >= 5:
-                break
-        
-        # Build forecast cards
-        forecast_cards = []
-        for forecast in daily_forecasts:
-            date = forecast.get("dt_txt", "").split()[0]
-            temp = forecast.get("main", {}).get("temp", 0)
-            temp_min = forecast.get("main", {}).get("temp_min", 0)
-            temp_max = forecast.get("main", {}).get("temp_max", 0)
-            description = forecast.get("weather", [{}])[0].get("description", "").title()
-            icon_code = forecast.get("weather", [{}])[0].get("icon", "01d")
-            
-            forecast_cards.append(
-                ft.Container(
-                    content=ft.Column(
-                        [
-                            ft.Text(date, size=14, weight=ft.FontWeight.BOLD),
-                            ft.Image(
-                                src=f"https://openweathermap.org/img/wn/{icon_code}.png",
-                                width=50,
-                                height=50,
-                            ),
-                            ft.Text(description, size=12, text_align=ft.TextAlign.CENTER),
-                            ft.Text(
-                                f"H: {temp_max:.0f}° L: {temp_min:.0f}°",
-                                size=12,
-                                weight=ft.FontWeight.BOLD,
-                            ),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        spacing=5,
-                    ),
-                    bgcolor=ft.Colors.WHITE,
-                    border_radius=10,
-                    padding=10,
-                    width=120,
-                )
+            # Show weather alerts (thresholds are in °C)
+            self.show_weather_alerts(
+                convert_temperature(data.temp, self.current_unit, "metric")
             )
-        
-        self.forecast_container.content = ft.Column(
-            [
-                ft.Text(
-                    "5-Day Forecast",
-                    size=20,
-                    weight=ft.FontWeight.BOLD,
-                ),
-                ft.Row(
-                    forecast_cards,
-                    alignment=ft.MainAxisAlignment.CENTER,
-                    wrap=True,
-                    spacing=10,
-                ),
-            ],
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=10,
-        )
-        
-        self.forecast_container.visible = True
-        self.page.update()
     
-    def create_info_card(self, icon, label, value):
-        """Create an info card for weather details."""
-        return ft.Container(
-            content=ft.Column(
-                [
-                    ft.Icon(icon, size=30, color=ft.Colors.BLUE_700),
-                    ft.Text(label, size=12, color=ft.Colors.GREY_600),
-                    ft.Text(
-                        value,
-                        size=16,
-                        weight=ft.FontWeight.BOLD,
-                        color=ft.Colors.BLUE_900,
-                    ),
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=5,
-            ),
-            bgcolor=ft.Colors.WHITE,
-            border_radius=10,
-            padding=15,
-            width=150,
-        )
+    def display_forecast(self, data: Forecast):
+        """Display 5-day forecast (the caller issues page.update())."""
+        with self.metrics.span("render", view="forecast"):
+            # Group all 3-hour slots into the city's local days
+            self.forecast_view.render(aggregate(data)[:len(self.forecast_view.cards)])
+        self.forecast_container.opacity = 1
+        self.forecast_container.visible = True
     
     def show_error(self, message: str):
         """Display error message."""
         self.error_message.value = f"❌ {message}"
         self.error_message.visible = True
+        self.loading.visible = False
         self.weather_container.visible = False
         self.forecast_container.visible = False
-        self.page.update()
+        self.update_page()
+    
+    def show_forecast_error(self, message: str):
+        """Show a forecast error without hiding the current weather."""
+        self.current_forecast_data = None
+        self.forecast_view.render_error(f"❌ Forecast unavailable: {message}")
+        self.forecast_container.opacity = 1
+        self.forecast_container.visible = True
     
     def show_weather_alerts(self, temp: float):
-        """Show weather alerts based on conditions."""
+        """Show weather alerts based on conditions (sent with the next page.update())."""
         if temp > 35:
             alert = ft.Banner(
                 bgcolor=ft.Colors.AMBER_100,
@@ -557,7 +711,6 @@ class WeatherApp:
             )
             self.page.banner = alert
             self.page.banner.open = True
-            self.page.update()
         elif temp < 0:
             alert = ft.Banner(
                 bgcolor=ft.Colors.LIGHT_BLUE_100,
@@ -569,60 +722,64 @@ class WeatherApp:
             )
             self.page.banner = alert
             self.page.banner.open = True
-            self.page.update()
     
     def close_banner(self):
         """Close the alert banner."""
         self.page.banner.open = False
-        self.page.update()
+        self.update_page()
     
     def toggle_theme(self, e):
-        """Toggle between light and dark theme."""
-        if self.page.theme_mode == ft.ThemeMode.LIGHT:
-            self.page.theme_mode = ft.ThemeMode.DARK
-            self.theme_button.icon = ft.Icons.LIGHT_MODE
-            # Dark mode colors
-            self.city_input.fill_color = ft.Colors.GREY_800
-            
-            # Update weather container to dark surface color
-            if self.weather_container.visible:
-                self.weather_container.bgcolor = ft.Colors.GREY_900
-                # Update info cards
-                if hasattr(self, 'info_cards'):
-                    for card in self.info_cards:
-                        card.bgcolor = ft.Colors.GREY_800
-            
-            # Update forecast container
-            if self.forecast_container.visible:
-                self.forecast_container.bgcolor = ft.Colors.GREY_900
-                # Update forecast cards
-                forecast_row = self.forecast_container.content.controls[1]
-                for card in forecast_row.controls:
-                    card.bgcolor = ft.Colors.GREY_800
-        else:
-            self.page.theme_mode = ft.ThemeMode.LIGHT
-            self.theme_button.icon = ft.Icons.DARK_MODE
-            # Light mode colors
-            self.city_input.fill_color = ft.Colors.GREY_300
-            
-            # Update weather container back to weather-based color
-            if self.weather_container.visible and self.current_weather_data:
-                weather_id = self.current_weather_data.get("weather", [{}])[0].get("id", 800)
-                self.weather_container.bgcolor = self.get_weather_color(weather_id)
-                # Update info cards
-                if hasattr(self, 'info_cards'):
-                    for card in self.info_cards:
-                        card.bgcolor = ft.Colors.WHITE
-            
-            # Update forecast container
-            if self.forecast_container.visible:
-                self.forecast_container.bgcolor = ft.Colors.BLUE_50
-                # Update forecast cards
-                forecast_row = self.forecast_container.content.controls[1]
-                for card in forecast_row.controls:
-                    card.bgcolor = ft.Colors.WHITE
+        """Toggle between light and dark theme.
         
-        self.page.update()
+        Controls use theme color roles, so only the theme mode changes.
+        """
+        dark = toggle_theme_mode(self.page)
+        self.theme_button.icon = ft.Icons.LIGHT_MODE if dark else ft.Icons.DARK_MODE
+        self.update_page()
+    
+    def on_keyboard(self, e: ft.KeyboardEvent):
+        """Keyboard shortcuts: Ctrl+Shift+D toggles the debug panel."""
+        if e.ctrl and e.shift and e.key.upper() == "D":
+            self.toggle_debug_panel()
+    
+    def toggle_debug_panel(self):
+        """Show or hide the timings panel."""
+        self.debug_panel.visible = not self.debug_panel.visible
+        if self._debug_future is not None:
+            self._debug_future.cancel()
+            self._debug_future = None
+        if self.debug_panel.visible:
+            self._debug_future = self.page.run_task(self.refresh_debug_panel)
+        else:
+            self.page.update()
+    
+    async def refresh_debug_panel(self):
+        """Redraw the timings once a second while the panel is open."""
+        while True:
+            self.debug_text.value = self.format_timings()
+            # Not timed, so the panel doesn't show up in its own numbers
+            self.page.update()
+            await asyncio.sleep(1)
+    
+    def format_timings(self, recent: int = 10) -> str:
+        """Per-series summary followed by the most recent spans."""
+        lines = [f"{'series':<46}{'n':>6}{'p50':>9}{'p95':>9}{'max':>9}  (ms)"]
+        for row in self.metrics.summary():
+            lines.append(
+                f"{row['series'][:46]:<46}{row['count']:>6}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['max_ms']:>9.1f}"
+            )
+        lines.append("")
+        lines.append("recent:")
+        for span in list(self.metrics.recent)[-recent:][::-1]:
+            stamp = time.strftime("%H:%M:%S", time.localtime(span.finished_at))
+            lines.append(f"{stamp}  {span.label[:46]:<46}{span.seconds * 1000:>9.1f}")
+        return "\n".join(lines)
+    
+    def copy_metrics(self, e):
+        """Copy all metrics in Prometheus text format to the clipboard."""
+        self.page.set_clipboard(self.metrics.to_prometheus())
+        self.page.open(ft.SnackBar(ft.Text("Metrics copied to clipboard")))
     
     def toggle_units(self, e):
         """Toggle between Celsius and Fahrenheit."""
@@ -635,23 +792,19 @@ class WeatherApp:
             self.current_unit = "metric"
         
         # Refresh display with current data
-        self.page.run_task(self.refresh_weather_display)
+        self.refresh_weather_display()
     
-    async def refresh_weather_display(self):
-        """Refresh weather display with new units."""
+    def refresh_weather_display(self):
+        """Refresh weather display with new units (converted locally, no refetch)."""
         if self.current_weather_data:
-            city = self.current_weather_data.get("name", "")
-            if city:
-                # Change the config unit temporarily
-                old_unit = Config.UNITS
-                Config.UNITS = self.current_unit
-                
-                try:
-                    weather_data = await self.weather_service.get_weather(city)
-                    self.current_weather_data = weather_data
-                    await self.display_weather(weather_data)
-                finally:
-                    Config.UNITS = old_unit
+            self.display_weather(
+                self.current_weather_data.to_units(self.current_unit)
+            )
+        if self.current_forecast_data:
+            self.display_forecast(
+                self.current_forecast_data.to_units(self.current_unit)
+            )
+        self.update_page()
 
 
 def main(page: ft.Page):
@@ -0,0 +1,181 @@
+# metrics.py
+"""In-process metrics: timing spans, counters and Prometheus text output."""
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class Span:
+    """One timed operation, kept for the debug panel."""
+
+    __slots__ = ("name", "labels", "seconds", "finished_at")
+
+    name: str
+    labels: Labels
+    seconds: float
+    finished_at: float  # time.time()
+
+    @property
+    def label(self) -> str:
+        """Name with labels, e.g. "http_request{endpoint=weather}"."""
+        if not self.labels:
+            return self.name
+        inner = ",".join(f"{k}={v}" for k, v in self.labels)
+        return f"{self.name}{{{inner}}}"
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent values."""
+
+    __slots__ = ("counts", "count", "total", "max", "recent")
+
+    def __init__(self, window: int):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile (0-100) of the recent window."""
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+class MetricsRegistry:
+    """
+    Collects timings and counters from the service and the app.
+
+    ``span()`` times a block and records it both in a per-series
+    histogram (for ``to_prometheus()``) and in a short list of recent
+    spans (for the app's debug panel). Series are identified by a name
+    plus keyword labels, e.g. ``observe("http_request", 0.2,
+    endpoint="weather")``. All methods are cheap enough to leave enabled.
+    """
+
+    def __init__(self, prefix: str = "weather_app", window: int = 256, recent: int = 50):
+        self.prefix = prefix
+        self.window = window
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self.recent: Deque[Span] = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration for the series name{labels}."""
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.window)
+            histogram.observe(seconds)
+            self.recent.append(Span(name, key[1], seconds, time.time()))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """Add value to the counter name{labels}."""
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the enclosed block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels) -> float:
+        """Current value of a counter."""
+        return self._counters.get((name, self._labels(labels)), 0)
+
+    def summary(self) -> List[Dict]:
+        """Per-series count, mean, p50, p95 and max in milliseconds."""
+        with self._lock:
+            items = list(self._histograms.items())
+        rows = []
+        for (name, labels), histogram in sorted(items):
+            rows.append({
+                "series": Span(name, labels, 0, 0).label,
+                "count": histogram.count,
+                "mean_ms": histogram.total / histogram.count * 1000,
+                "p50_ms": histogram.percentile(50) * 1000,
+                "p95_ms": histogram.percentile(95) * 1000,
+                "max_ms": histogram.max * 1000,
+            })
+        return rows
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.recent.clear()
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: str = "") -> str:
+        parts = [f'{k}="{v}"' for k, v in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def to_prometheus(self) -> str:
+        """Everything recorded, in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        declared = set()
+        for (name, labels), histogram in histograms:
+            metric = f"{self.prefix}_{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                le = self._format_labels(labels, f'le="{bound}"')
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            le = self._format_labels(labels, 'le="+Inf"')
+            lines.append(f"{metric}_bucket{le} {histogram.count}")
+            lines.append(f"{metric}_sum{self._format_labels(labels)} {histogram.total}")
+            lines.append(f"{metric}_count{self._format_labels(labels)} {histogram.count}")
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the weather service and the app unless they are given their own
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,199 @@
+# mock_owm.py
+"""Offline stand-in for the OpenWeatherMap API.
+
+``MockOpenWeatherMap`` replays recorded ``/weather`` and ``/forecast``
+payloads from the ``fixtures`` directory through an ``httpx.MockTransport``,
+so the service and the app can be tested and benchmarked without network
+access or an API key. Latency, server errors, timeouts and 429s can be
+injected at configurable rates; a seeded RNG keeps runs reproducible.
+
+Fixtures are stored per endpoint as ``fixtures/<endpoint>/<city>.json``.
+To record fresh payloads from the live API (needs OPENWEATHER_API_KEY)::
+
+    python mock_owm.py record London Tokyo
+"""
+
+import asyncio
+import json
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+ENDPOINTS = ("weather", "forecast")
+
+
+class MockOpenWeatherMap:
+    """
+    Replays fixtures for the weather, forecast and group endpoints.
+
+    Cities are matched by name (``q``, case-insensitive, ignoring any
+    ",country" suffix), by ``id`` and by nearest coordinates (``lat``/
+    ``lon``). Unknown cities get the API's 404 and a missing ``appid``
+    its 401. Counters of calls per endpoint and of response statuses are
+    kept in ``calls`` and ``statuses``.
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: Path = FIXTURES_DIR,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        retry_after: float = 1.0,
+        error_retry_after: Optional[float] = None,
+        seed: Optional[int] = 0,
+    ):
+        """
+        Args:
+            fixtures_dir: Directory with weather/ and forecast/ fixtures
+            latency: Base response time in seconds
+            jitter: Extra random response time, uniform in [0, jitter]
+            error_rate: Share of requests answered with 503
+            rate_limit_rate: Share of requests answered with 429
+            timeout_rate: Share of requests that raise a read timeout
+            retry_after: Retry-After seconds sent with each 429
+            error_retry_after: Retry-After seconds sent with each 503 (None: no header)
+            seed: RNG seed (None for a random one)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.retry_after = retry_after
+        self.error_retry_after = error_retry_after
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.fixtures: Dict[str, Dict[str, Dict]] = {}
+        self.load(fixtures_dir)
+
+    def load(self, fixtures_dir: Path):
+        """Load every fixture under fixtures_dir, keyed by endpoint and city."""
+        for endpoint in ENDPOINTS:
+            payloads = self.fixtures.setdefault(endpoint, {})
+            for path in sorted(Path(fixtures_dir, endpoint).glob("*.json")):
+                payloads[path.stem] = json.loads(path.read_text(encoding="utf-8"))
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        """Transport to pass to httpx.AsyncClient / WeatherService."""
+        return httpx.MockTransport(self.handle)
+
+    def reset(self):
+        """Clear the call and status counters."""
+        self.calls.clear()
+        self.statuses.clear()
+
+    @staticmethod
+    def _city_info(endpoint: str, payload: Dict) -> Dict:
+        """The part of a payload describing the city (id, name, coord)."""
+        return payload["city"] if endpoint == "forecast" else payload
+
+    def _find(self, endpoint: str, params) -> Optional[Dict]:
+        payloads = self.fixtures.get(endpoint, {})
+        if "q" in params:
+            name = params["q"].split(",")[0].strip().lower()
+            return payloads.get(name)
+        if "id" in params:
+            city_id = int(params["id"])
+            for payload in payloads.values():
+                if self._city_info(endpoint, payload).get("id") == city_id:
+                    return payload
+            return None
+        if "lat" in params and "lon" in params:
+            lat, lon = float(params["lat"]), float(params["lon"])
+
+            def distance(payload):
+                coord = self._city_info(endpoint, payload)["coord"]
+                return (coord["lat"] - lat) ** 2 + (coord["lon"] - lon) ** 2
+
+            return min(payloads.values(), key=distance, default=None)
+        return None
+
+    def _group(self, params) -> Dict:
+        items = []
+        for city_id in params["id"].split(","):
+            payload = self._find("weather", {"id": city_id})
+            if payload is not None:
+                items.append(payload)
+        return {"cnt": len(items), "list": items}
+
+    def _respond(self, status: int, payload: Dict, headers=None) -> httpx.Response:
+        self.statuses[status] += 1
+        return httpx.Response(status, json=payload, headers=headers)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one request the way the live API would."""
+        endpoint = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = request.url.params
+        self.calls[endpoint] += 1
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self.random.random()
+        if roll < self.timeout_rate:
+            self.statuses["timeout"] += 1
+            raise httpx.ReadTimeout("Mock read timeout", request=request)
+        roll -= self.timeout_rate
+        if roll < self.rate_limit_rate:
+            return self._respond(
+                429,
+                {"cod": 429, "message": "Your account is temporarily blocked"},
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        roll -= self.rate_limit_rate
+        if roll < self.error_rate:
+            headers = None
+            if self.error_retry_after is not None:
+                headers = {"Retry-After": str(self.error_retry_after)}
+            return self._respond(
+                503, {"cod": 503, "message": "Service unavailable"}, headers=headers
+            )
+
+        if not params.get("appid"):
+            return self._respond(401, {"cod": 401, "message": "Invalid API key."})
+        if endpoint == "group":
+            return self._respond(200, self._group(params))
+        if endpoint not in ENDPOINTS:
+            return self._respond(404, {"cod": "404", "message": "Internal error"})
+
+        payload = self._find(endpoint, params)
+        if payload is None:
+            return self._respond(404, {"cod": "404", "message": "city not found"})
+        return self._respond(200, payload)
+
+
+async def record(cities, fixtures_dir: Path = FIXTURES_DIR):
+    """Save live weather and forecast payloads for cities as fixtures."""
+    from weather_service import WeatherService
+
+    async with WeatherService() as service:
+        for city in cities:
+            for endpoint, url in (
+                ("weather", service.base_url),
+                ("forecast", service.forecast_url),
+            ):
+                data = await service._request(
+                    url, {"q": city, "units": "metric"}, city=city
+                )
+                path = Path(fixtures_dir, endpoint, f"{city.lower()}.json")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+                print(f"Recorded {path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "record":
+        print("Usage: python mock_owm.py record CITY [CITY ...]")
+        sys.exit(1)
+    asyncio.run(record(sys.argv[2:]))
@@ -0,0 +1,257 @@
+# models.py
+"""Typed weather data models, parsed once from API responses."""
+
+import sys
+from array import array
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List
+
+from units import convert_pressure, convert_speed, convert_temperature
+
+
+def _condition(item: Dict) -> Dict:
+    """First entry of an item's "weather" list (the primary condition)."""
+    conditions = item.get("weather") or [{}]
+    return conditions[0]
+
+
+def _precipitation(item: Dict) -> float:
+    """Rain plus snow volume in mm (3h for forecasts, 1h for current weather)."""
+    total = 0.0
+    for kind in ("rain", "snow"):
+        volume = item.get(kind) or {}
+        total += volume.get("3h", volume.get("1h", 0.0))
+    return total
+
+
+@dataclass(frozen=True)
+class CurrentWeather:
+    """Current conditions for one location."""
+
+    __slots__ = (
+        "city_id", "city_name", "country", "lat", "lon", "timezone", "dt",
+        "temp", "feels_like", "temp_min", "temp_max", "pressure", "humidity",
+        "wind_speed", "weather_id", "description", "icon", "units",
+    )
+
+    city_id: int
+    city_name: str
+    country: str
+    lat: float
+    lon: float
+    timezone: int  # Offset from UTC in seconds
+    dt: int
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    pressure: float
+    humidity: int
+    wind_speed: float
+    weather_id: int
+    description: str
+    icon: str
+    units: str
+
+    @classmethod
+    def from_json(cls, data: Dict, units: str) -> "CurrentWeather":
+        """
+        Build from a current weather payload.
+
+        Raises:
+            ValueError: If the payload is missing required fields
+        """
+        try:
+            main = data["main"]
+            condition = _condition(data)
+            coord = data.get("coord", {})
+            return cls(
+                city_id=int(data.get("id", 0)),
+                city_name=data.get("name", "Unknown"),
+                country=data.get("sys", {}).get("country", ""),
+                lat=float(coord.get("lat", 0.0)),
+                lon=float(coord.get("lon", 0.0)),
+                timezone=int(data.get("timezone", 0)),
+                dt=int(data.get("dt", 0)),
+                temp=float(main["temp"]),
+                feels_like=float(main.get("feels_like", main["temp"])),
+                temp_min=float(main.get("temp_min", main["temp"])),
+                temp_max=float(main.get("temp_max", main["temp"])),
+                pressure=float(main.get("pressure", 0.0)),
+                humidity=int(main.get("humidity", 0)),
+                wind_speed=float(data.get("wind", {}).get("speed", 0.0)),
+                weather_id=int(condition.get("id", 800)),
+                description=condition.get("description", ""),
+                icon=condition.get("icon", "01d"),
+                units=units,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed weather payload: {e!r}") from None
+
+    def to_units(self, units: str) -> "CurrentWeather":
+        """Return a copy converted to another unit system."""
+        if units == self.units:
+            return self
+        src = self.units
+        return replace(
+            self,
+            temp=convert_temperature(self.temp, src, units),
+            feels_like=convert_temperature(self.feels_like, src, units),
+            temp_min=convert_temperature(self.temp_min, src, units),
+            temp_max=convert_temperature(self.temp_max, src, units),
+            pressure=convert_pressure(self.pressure, src, units),
+            wind_speed=convert_speed(self.wind_speed, src, units),
+            units=units,
+        )
+
+
+@dataclass(frozen=True)
+class ForecastPoint:
+    """One 3-hourly forecast entry."""
+
+    __slots__ = (
+        "dt", "temp", "feels_like", "temp_min", "temp_max", "pressure",
+        "humidity", "wind_speed", "precip", "weather_id", "description", "icon",
+    )
+
+    dt: int
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    pressure: float
+    humidity: int
+    wind_speed: float
+    precip: float
+    weather_id: int
+    description: str
+    icon: str
+
+
+class Forecast:
+    """
+    5-day / 3-hour forecast stored as compact columns.
+
+    Each numeric field is kept in an ``array`` (one machine value per
+    entry instead of a nested dict), and the few distinct description and
+    icon strings are interned. ``ForecastPoint`` objects are only built
+    when an entry is accessed.
+    """
+
+    __slots__ = (
+        "city_id", "city_name", "country", "timezone", "units",
+        "dt", "temp", "feels_like", "temp_min", "temp_max", "pressure",
+        "humidity", "wind_speed", "precip", "weather_id", "description", "icon",
+    )
+
+    def __init__(
+        self,
+        city_id: int = 0,
+        city_name: str = "",
+        country: str = "",
+        timezone: int = 0,
+        units: str = "metric",
+    ):
+        self.city_id = city_id
+        self.city_name = city_name
+        self.country = country
+        self.timezone = timezone  # Offset from UTC in seconds
+        self.units = units
+        self.dt = array("q")
+        self.temp = array("d")
+        self.feels_like = array("d")
+        self.temp_min = array("d")
+        self.temp_max = array("d")
+        self.pressure = array("d")
+        self.humidity = array("i")
+        self.wind_speed = array("d")
+        self.precip = array("d")
+        self.weather_id = array("i")
+        self.description: List[str] = []
+        self.icon: List[str] = []
+
+    @classmethod
+    def from_json(cls, data: Dict, units: str) -> "Forecast":
+        """
+        Build from a forecast payload.
+
+        Raises:
+            ValueError: If the payload is missing required fields
+        """
+        city = data.get("city", {})
+        forecast = cls(
+            city_id=int(city.get("id", 0)),
+            city_name=city.get("name", ""),
+            country=city.get("country", ""),
+            timezone=int(city.get("timezone", 0)),
+            units=units,
+        )
+        try:
+            for item in data["list"]:
+                main = item["main"]
+                condition = _condition(item)
+                temp = float(main["temp"])
+                forecast.dt.append(int(item["dt"]))
+                forecast.temp.append(temp)
+                forecast.feels_like.append(float(main.get("feels_like", temp)))
+                forecast.temp_min.append(float(main.get("temp_min", temp)))
+                forecast.temp_max.append(float(main.get("temp_max", temp)))
+                forecast.pressure.append(float(main.get("pressure", 0.0)))
+                forecast.humidity.append(int(main.get("humidity", 0)))
+                forecast.wind_speed.append(float(item.get("wind", {}).get("speed", 0.0)))
+                forecast.precip.append(_precipitation(item))
+                forecast.weather_id.append(int(condition.get("id", 800)))
+                forecast.description.append(sys.intern(condition.get("description", "")))
+                forecast.icon.append(sys.intern(condition.get("icon", "01d")))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed forecast payload: {e!r}") from None
+        return forecast
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    def __getitem__(self, index: int) -> ForecastPoint:
+        return ForecastPoint(
+            dt=self.dt[index],
+            temp=self.temp[index],
+            feels_like=self.feels_like[index],
+            temp_min=self.temp_min[index],
+            temp_max=self.temp_max[index],
+            pressure=self.pressure[index],
+            humidity=self.humidity[index],
+            wind_speed=self.wind_speed[index],
+            precip=self.precip[index],
+            weather_id=self.weather_id[index],
+            description=self.description[index],
+            icon=self.icon[index],
+        )
+
+    def __iter__(self) -> Iterator[ForecastPoint]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_units(self, units: str) -> "Forecast":
+        """Return a copy converted to another unit system."""
+        if units == self.units:
+            return self
+        src = self.units
+        converted = Forecast(
+            self.city_id, self.city_name, self.country, self.timezone, units
+        )
+        converted.dt = self.dt
+        converted.humidity = self.humidity
+        converted.precip = self.precip
+        converted.weather_id = self.weather_id
+        converted.description = self.description
+        converted.icon = self.icon
+        for field in ("temp", "feels_like", "temp_min", "temp_max"):
+            setattr(converted, field, array(
+                "d", (convert_temperature(v, src, units) for v in getattr(self, field))
+            ))
+        converted.pressure = array(
+            "d", (convert_pressure(v, src, units) for v in self.pressure)
+        )
+        converted.wind_speed = array(
+            "d", (convert_speed(v, src, units) for v in self.wind_speed)
+        )
+        return converted
@@ -0,0 +1,99 @@
+# rate_limit.py
+"""Request rate limiting and retry helpers for the weather service."""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Adaptive token-bucket rate limiter shared by all API requests.
+
+    Tokens refill at ``rate_per_minute`` up to ``burst``; each request
+    takes one token and waits when none are left. When the server answers
+    429 the refill rate is halved (and all requests pause for the
+    server's ``Retry-After``); each success then raises it again by a small
+    step until it is back at the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: int = 1,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.max_rate = rate_per_minute / 60.0
+        self.min_rate = self.max_rate / 8
+        self.rate = self.max_rate
+        self.capacity = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.throttled = 0  # Requests that had to wait for a token
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        async with self._lock:
+            waited = False
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    waited = True
+                    await self._sleep(self._paused_until - now)
+                    continue
+
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+
+                waited = True
+                await self._sleep((1 - self._tokens) / self.rate)
+
+            if waited:
+                self.throttled += 1
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Slow down after a 429, pausing everyone for retry_after seconds."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, self._clock() + retry_after)
+
+    def reward(self):
+        """Recover towards the configured rate after a successful request."""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 16)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,84 @@
+# refresh_scheduler.py
+"""Background prefetching of weather for history cities."""
+
+import asyncio
+import logging
+from typing import Callable, Optional, Sequence
+
+from config import Config
+from models import CurrentWeather
+from weather_service import WeatherService, WeatherServiceError
+
+logger = logging.getLogger(__name__)
+
+# API requests one refresh may send: current weather plus forecast
+REQUESTS_PER_REFRESH = 2
+
+
+class RefreshScheduler:
+    """
+    Periodically refresh weather for a changing list of cities.
+
+    Each cycle walks the city list with the refreshes spread evenly over
+    ``interval`` seconds, so requests never arrive in a burst. The gap
+    between two refreshes is never shorter than what ``rate_share`` of
+    the service's rate limit allows for ``REQUESTS_PER_REFRESH`` requests,
+    leaving the rest for interactive searches.
+    Results land in the service cache, so clicking a prefetched city
+    renders without waiting on the network.
+    """
+
+    def __init__(
+        self,
+        service: WeatherService,
+        get_cities: Callable[[], Sequence[str]],
+        interval: float = Config.REFRESH_INTERVAL,
+        rate_share: float = Config.REFRESH_RATE_SHARE,
+        on_refresh: Optional[Callable[[str, CurrentWeather], None]] = None,
+        sleep=asyncio.sleep,
+    ):
+        self.service = service
+        self.get_cities = get_cities
+        self.interval = interval
+        self.rate_share = rate_share
+        self.on_refresh = on_refresh
+        self._sleep = sleep
+        self.refreshed = 0
+        self.failed = 0
+
+    @property
+    def min_gap(self) -> float:
+        """Shortest gap (seconds) between refreshes that stays within rate_share."""
+        return REQUESTS_PER_REFRESH / (self.service.rate_limiter.max_rate * self.rate_share)
+
+    async def refresh(self, city: str):
+        """Prefetch one city, reporting the new weather through on_refresh."""
+        try:
+            weather = await self.service.prefetch(city)
+        except WeatherServiceError:
+            self.failed += 1
+            return
+        except Exception:
+            # One bad city must not stop the refreshes for the others
+            logger.exception("Refreshing %s failed", city)
+            self.failed += 1
+            return
+        self.refreshed += 1
+        if self.on_refresh is not None:
+            try:
+                self.on_refresh(city, weather)
+            except Exception:
+                logger.exception("Showing the refreshed weather for %s failed", city)
+
+    async def run(self):
+        """Refresh forever; cancel the task to stop."""
+        while True:
+            cities = list(self.get_cities())
+            if not cities:
+                await self._sleep(self.interval)
+                continue
+
+            gap = max(self.min_gap, self.interval / len(cities))
+            for city in cities:
+                await self.refresh(city)
+                await self._sleep(gap)
@@ -0,0 +1,121 @@
+# test_cache.py
+"""Tests for the in-memory TTL + LRU response cache."""
+
+import pytest
+
+from cache import NullCache, TTLCache, make_key
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the test advances it."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_make_key_normalizes_locations():
+    """Near-identical lookups share one key."""
+    assert make_key("weather", "  New   YORK ", "metric") == ("weather", "new york", "metric")
+    assert make_key("weather", (51.5074, -0.1278), "metric") == ("weather", (51.51, -0.13), "metric")
+    assert make_key("weather", 2643743, "metric") == ("weather", 2643743, "metric")
+    assert make_key("weather", "London", "metric") != make_key("forecast", "London", "metric")
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(clock=clock)
+    cache.set("london", "sunny", ttl=60)
+    clock.advance(59)
+    assert cache.get("london") == "sunny"
+    assert "london" in cache
+
+    clock.advance(1)
+    assert cache.get("london", "gone") == "gone"
+    assert "london" not in cache
+    assert len(cache) == 0
+
+
+def test_set_replaces_value_and_ttl(clock):
+    cache = TTLCache(clock=clock)
+    cache.set("london", "sunny", ttl=10)
+    clock.advance(5)
+    cache.set("london", "rain", ttl=10)
+    clock.advance(8)
+    assert cache.get("london") == "rain"
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    """Past max_entries the entry read or written longest ago goes first."""
+    cache = TTLCache(max_entries=2, clock=clock)
+    cache.set("london", 1, ttl=60)
+    cache.set("paris", 2, ttl=60)
+    cache.get("london")  # Paris is now the least recently used
+    cache.set("tokyo", 3, ttl=60)
+
+    assert "paris" not in cache
+    assert cache.get("london") == 1
+    assert cache.get("tokyo") == 3
+    assert cache.evictions == 1
+
+
+def test_peek_does_not_refresh_recency(clock):
+    cache = TTLCache(max_entries=2, clock=clock)
+    cache.set("london", 1, ttl=60)
+    cache.set("paris", 2, ttl=60)
+    assert cache.peek("london") == 1
+    cache.set("tokyo", 3, ttl=60)
+
+    assert "london" not in cache
+    assert "paris" in cache
+
+
+def test_peek_skips_expired_entries_and_counters(clock):
+    cache = TTLCache(clock=clock)
+    cache.set("london", 1, ttl=60)
+    assert cache.peek("paris") is None
+    clock.advance(60)
+    assert cache.peek("london", "gone") == "gone"
+    assert cache.stats == {"hits": 0, "misses": 0, "evictions": 0, "size": 1}
+
+
+def test_counters(clock):
+    """Hits, misses (including expired entries) and evictions are counted."""
+    cache = TTLCache(max_entries=1, clock=clock)
+    cache.get("london")
+    cache.set("london", 1, ttl=60)
+    cache.get("london")
+    cache.get("london")
+    cache.set("paris", 2, ttl=10)
+    clock.advance(10)
+    cache.get("paris")
+
+    assert cache.stats == {"hits": 2, "misses": 2, "evictions": 1, "size": 0}
+
+
+def test_clear_keeps_counters(clock):
+    cache = TTLCache(clock=clock)
+    cache.set("london", 1, ttl=60)
+    cache.get("london")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("london") is None
+    assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0, "size": 0}
+
+
+def test_null_cache_stores_nothing():
+    cache = NullCache()
+    cache.set("london", 1, ttl=60)
+    assert cache.get("london", "default") == "default"
+    assert cache.peek("london") is None
+    assert cache.stats["size"] == 0
@@ -0,0 +1,113 @@
+# test_city_index.py
+"""Tests for the offline city index behind autocomplete."""
+
+import gzip
+import json
+
+import pytest
+
+from city_index import CityIndex, normalize
+
+CITIES = [
+    # (city_id, name, state, country, population)
+    (2643743, "London", "", "GB", 7556900),
+    (6058560, "London", "ON", "CA", 346765),
+    (4517009, "London", "OH", "US", 9904),
+    (2643734, "Londonderry", "", "GB", 83652),
+    (1850147, "Tokyo", "", "JP", 8336599),
+    (3448439, "São Paulo", "", "BR", 10021295),
+    (2988507, "Paris", "", "FR", 2138551),
+    (4717560, "Paris", "TX", "US", 25171),
+]
+
+
+@pytest.fixture
+def index():
+    return CityIndex(CITIES)
+
+
+def write_city_list(path, cities, compress=False):
+    raw = [
+        {"id": city_id, "name": name, "state": state, "country": country,
+         "stat": {"population": population}}
+        for city_id, name, state, country, population in cities
+    ]
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(raw, f)
+
+
+def test_normalize():
+    assert normalize("  São   PAULO ") == "sao paulo"
+
+
+def test_prefix_ranks_by_population(index):
+    """Every city starting with the text, most populous first."""
+    results = index.prefix("lond")
+    assert [r.city_id for r in results] == [2643743, 6058560, 2643734, 4517009]
+    assert results[1].label == "London, ON, CA"
+
+
+def test_prefix_ignores_case_and_accents(index):
+    assert [r.name for r in index.prefix("SAO")] == ["São Paulo"]
+
+
+def test_prefix_respects_limit(index):
+    assert [r.city_id for r in index.prefix("l", limit=2)] == [2643743, 6058560]
+    assert index.prefix("") == []
+
+
+def test_search_falls_back_to_fuzzy(index):
+    """A typo with no prefix match still finds the city."""
+    assert index.prefix("Tokoy") == []
+    assert [r.name for r in index.search("Tokoy")] == ["Tokyo"]
+
+
+def test_resolve_prefers_most_populous(index):
+    """Exact names resolve to the biggest city with that name."""
+    assert index.resolve("london") == 2643743
+    assert index.resolve("paris") == 2988507
+    assert index.resolve("Lond") is None
+
+
+def test_resolve_leaves_ambiguous_names_to_the_api():
+    """Without populations to tell same-named cities apart, only unique names resolve."""
+    index = CityIndex([
+        (2643743, "London", "", "GB", 0),
+        (6058560, "London", "ON", "CA", 0),
+        (1850147, "Tokyo", "", "JP", 0),
+    ])
+    assert index.resolve("London") is None
+    assert index.resolve("tokyo") == 1850147
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_load(tmp_path, compress):
+    """Plain and gzipped city lists load the same."""
+    path = tmp_path / ("city.list.json.gz" if compress else "city.list.json")
+    write_city_list(path, CITIES, compress)
+    index = CityIndex.load(path)
+    assert len(index) == len(CITIES)
+    assert index.prefix("tok")[0].population == 8336599
+
+
+def test_load_missing_file(tmp_path):
+    with pytest.raises(OSError):
+        CityIndex.load(tmp_path / "city.list.json")
+
+
+def test_load_empty_list(tmp_path):
+    """An empty list gives an index that finds nothing."""
+    path = tmp_path / "city.list.json"
+    write_city_list(path, [])
+    index = CityIndex.load(path)
+    assert len(index) == 0
+    assert index.search("London") == []
+    assert index.resolve("London") is None
+
+
+def test_load_invalid_list(tmp_path):
+    path = tmp_path / "city.list.json"
+    path.write_text('[{"name": "London"}]', encoding="utf-8")
+    with pytest.raises(ValueError, match="Invalid city list"):
+        CityIndex.load(path)
@@ -0,0 +1,104 @@
+# test_forecast_aggregation.py
+"""Tests for bucketing forecasts by day, on the NumPy and the pure Python path."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import forecast_aggregation
+from forecast_aggregation import aggregate, aggregate_many
+from models import Forecast
+
+
+def load_forecast(city):
+    path = Path(__file__).parent / "fixtures" / "forecast" / f"{city}.json"
+    return Forecast.from_json(json.loads(path.read_text(encoding="utf-8")), "metric")
+
+
+def make_forecast(slots, timezone=0):
+    """Forecast from (dt, temp, precip, description) slots."""
+    return Forecast.from_json({
+        "city": {"timezone": timezone},
+        "list": [
+            {
+                "dt": dt,
+                "main": {"temp": temp, "temp_min": temp - 1, "temp_max": temp + 1},
+                "rain": {"3h": precip},
+                "weather": [{"id": 800, "description": description, "icon": "01d"}],
+            }
+            for dt, temp, precip, description in slots
+        ],
+    }, "metric")
+
+
+def bucket_fields(bucket):
+    return (bucket.start, bucket.label, bucket.weather_id, bucket.description,
+            bucket.icon, bucket.count)
+
+
+def bucket_values(bucket):
+    return (bucket.temp_min, bucket.temp_max, bucket.temp_mean, bucket.precip)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def aggregation_backend(request, monkeypatch):
+    """Run a test against both the NumPy and the pure Python aggregation."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(forecast_aggregation, "_numpy_module", False)
+    else:
+        monkeypatch.setattr(forecast_aggregation, "_numpy_module", None)
+    return request.param
+
+
+@pytest.mark.parametrize("bucket_hours", [24, 12, 6, 3])
+def test_numpy_and_python_aggregation_agree(monkeypatch, bucket_hours):
+    """The vectorized path gives the same buckets as the Python loop."""
+    pytest.importorskip("numpy")
+    forecasts = [load_forecast("london"), make_forecast([]), load_forecast("tokyo")]
+    monkeypatch.setattr(forecast_aggregation, "_numpy_module", None)
+    expected = aggregate_many(forecasts, bucket_hours)
+    monkeypatch.setattr(forecast_aggregation, "_numpy_module", False)
+    actual = aggregate_many(forecasts, bucket_hours)
+
+    assert [len(b) for b in actual] == [len(b) for b in expected]
+    for got, want in zip(sum(actual, []), sum(expected, [])):
+        assert bucket_fields(got) == bucket_fields(want)
+        assert bucket_values(got) == pytest.approx(bucket_values(want))
+
+
+def test_days_split_at_local_midnight(aggregation_backend):
+    """Buckets follow the city's calendar day, not UTC's."""
+    # UTC+9: 12:00 and 15:00 UTC are 21:00 and 00:00 local time
+    day = 1_700_006_400  # 2023-11-15 00:00 UTC
+    forecast = make_forecast([
+        (day + 12 * 3600, 10.0, 0.0, "clear"),
+        (day + 15 * 3600, 20.0, 1.5, "rain"),
+        (day + 18 * 3600, 30.0, 2.5, "rain"),
+    ], timezone=9 * 3600)
+    first, second = aggregate(forecast)
+    assert (first.label, first.count) == ("2023-11-15", 1)
+    assert (second.label, second.count) == ("2023-11-16", 2)
+    assert second.start == day + 15 * 3600
+    assert second.temp_mean == pytest.approx(25.0)
+    assert second.precip == pytest.approx(4.0)
+
+
+def test_single_sample_bucket(aggregation_backend):
+    """A day with one slot uses it for every statistic."""
+    (bucket,) = aggregate(make_forecast([(1_700_049_600, 12.5, 0.5, "mist")]))
+    assert bucket.count == 1
+    assert (bucket.temp_min, bucket.temp_mean, bucket.temp_max) == (11.5, 12.5, 13.5)
+    assert bucket.precip == 0.5
+    assert bucket.description == "mist"
+
+
+def test_empty_forecast(aggregation_backend):
+    assert aggregate(make_forecast([])) == []
+    assert aggregate_many([]) == []
+
+
+def test_bucket_hours_must_divide_a_day():
+    with pytest.raises(ValueError, match="must divide 24"):
+        aggregate(make_forecast([]), bucket_hours=5)
@@ -0,0 +1,80 @@
+# test_history_store.py
+"""Tests for the append-only search history log."""
+
+import itertools
+
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return tmp_path / "search_history.jsonl"
+
+
+def make_store(path, **kwargs):
+    clock = itertools.count(1_700_000_000).__next__
+    return HistoryStore(path, legacy_path=None, clock=clock, **kwargs)
+
+
+def log_lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_records_survive_a_reload(history_path):
+    """Searches are counted per city ID and read back from the log."""
+    store = make_store(history_path)
+    store.load()
+    store.record("london", 2643743)
+    store.record("London", 2643743)
+    store.record("Tokyo", 1850147)
+
+    entries = {e.city_id: e for e in make_store(history_path).load()}
+    assert entries[2643743].hits == 2
+    assert entries[2643743].city == "London"
+    assert entries[1850147].hits == 1
+
+
+def test_append_after_torn_line_is_kept(history_path):
+    """A record written after a crash mid-write isn't lost with the torn line."""
+    store = make_store(history_path)
+    store.load()
+    store.record("London", 2643743)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write('{"city": "Par')  # Crash before the newline
+
+    store = make_store(history_path)
+    store.load()
+    store.record("Tokyo", 1850147)
+
+    assert len(log_lines(history_path)) == 3
+    cities = {e.city for e in make_store(history_path).load()}
+    assert cities == {"London", "Tokyo"}
+
+
+def test_compaction_rewrites_one_line_per_city(history_path):
+    """Past compact_after lines the log is rewritten, keeping hit counts."""
+    store = make_store(history_path, compact_after=5)
+    store.load()
+    for _ in range(4):
+        store.record("London", 2643743)
+    store.record("Tokyo", 1850147)
+    assert len(log_lines(history_path)) == 5
+
+    store.record("Tokyo", 1850147)
+    assert len(log_lines(history_path)) == 2
+    assert not history_path.with_name(history_path.name + ".tmp").exists()
+
+    entries = {e.city_id: e.hits for e in make_store(history_path).load()}
+    assert entries == {2643743: 4, 1850147: 2}
+
+
+def test_compaction_trims_to_max_entries(history_path):
+    """Only the most recently searched cities are kept."""
+    store = make_store(history_path, max_entries=2)
+    store.load()
+    for city in ("Paris", "Tokyo", "London"):
+        store.record(city)
+    store.compact()
+    assert [e.city for e in make_store(history_path).load()] == ["London", "Tokyo"]
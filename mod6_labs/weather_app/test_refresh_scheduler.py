@@ -0,0 +1,113 @@
+# test_refresh_scheduler.py
+"""Tests for background prefetching of history cities."""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limit import TokenBucket
+from refresh_scheduler import RefreshScheduler
+from weather_service import WeatherServiceError
+
+pytestmark = pytest.mark.anyio
+
+
+class StopScheduler(Exception):
+    """Raised by the fake sleep to end run() after the expected waits."""
+
+
+class FakeService:
+    """Prefetches by name, failing for the cities in errors."""
+
+    def __init__(self, rate_per_minute=60, errors=None):
+        self.rate_limiter = TokenBucket(rate_per_minute)
+        self.errors = errors or {}
+        self.prefetched = []
+
+    async def prefetch(self, city):
+        self.prefetched.append(city)
+        if city in self.errors:
+            raise self.errors[city]
+        return SimpleNamespace(city_name=city)
+
+
+def make_scheduler(service, cities, sleeps=3, **kwargs):
+    """Scheduler whose sleep records each wait and stops run() after sleeps of them."""
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+        if len(waits) == sleeps:
+            raise StopScheduler
+
+    scheduler = RefreshScheduler(service, lambda: cities, sleep=sleep, **kwargs)
+    return scheduler, waits
+
+
+async def run_until_stopped(scheduler):
+    with pytest.raises(StopScheduler):
+        await scheduler.run()
+
+
+async def test_refreshes_spread_over_interval():
+    service = FakeService(rate_per_minute=600)
+    scheduler, waits = make_scheduler(
+        service, ["London", "Paris", "Tokyo"], interval=30, rate_share=0.25
+    )
+    await run_until_stopped(scheduler)
+    assert service.prefetched == ["London", "Paris", "Tokyo"]
+    assert waits == [pytest.approx(10.0)] * 3
+    assert scheduler.refreshed == 3
+
+
+async def test_gap_budgets_both_requests_of_a_refresh():
+    """Each refresh sends two requests, paced by the service's own limiter."""
+    service = FakeService(rate_per_minute=60)  # 1 request/s, so 0.25/s for refreshes
+    scheduler, waits = make_scheduler(
+        service, ["London", "Paris", "Tokyo"], interval=3, rate_share=0.25
+    )
+    assert scheduler.min_gap == pytest.approx(8.0)
+    await run_until_stopped(scheduler)
+    assert waits == [pytest.approx(8.0)] * 3
+
+
+async def test_empty_city_list_waits_a_full_interval():
+    service = FakeService()
+    scheduler, waits = make_scheduler(service, [], sleeps=2, interval=540)
+    await run_until_stopped(scheduler)
+    assert waits == [540, 540]
+    assert service.prefetched == []
+
+
+async def test_failures_do_not_stop_the_loop(caplog):
+    """Service errors are counted; unexpected ones are logged too, and the loop goes on."""
+    service = FakeService(errors={
+        "Atlantis": WeatherServiceError("City not found"),
+        "Paris": KeyError("main"),
+    })
+    refreshed = []
+    scheduler, _ = make_scheduler(
+        service, ["Atlantis", "Paris", "Tokyo"],
+        on_refresh=lambda city, weather: refreshed.append(weather.city_name),
+    )
+    with caplog.at_level(logging.ERROR, logger="refresh_scheduler"):
+        await run_until_stopped(scheduler)
+
+    assert service.prefetched == ["Atlantis", "Paris", "Tokyo"]
+    assert refreshed == ["Tokyo"]
+    assert (scheduler.refreshed, scheduler.failed) == (1, 2)
+    assert [r.getMessage() for r in caplog.records] == ["Refreshing Paris failed"]
+
+
+async def test_failing_on_refresh_is_logged(caplog):
+    def on_refresh(city, weather):
+        raise RuntimeError("page closed")
+
+    service = FakeService()
+    scheduler, _ = make_scheduler(service, ["London", "Paris"], sleeps=2, on_refresh=on_refresh)
+    with caplog.at_level(logging.ERROR, logger="refresh_scheduler"):
+        await run_until_stopped(scheduler)
+    assert service.prefetched == ["London", "Paris"]
+    assert scheduler.refreshed == 2
+    assert len(caplog.records) == 2
@@ -0,0 +1,156 @@
+# test_weather_app.py
+"""Tests for the weather app UI flow, run headless against the mock API."""
+
+import asyncio
+from types import SimpleNamespace
+
+import flet as ft
+import pytest
+
+from city_index import CityIndex
+from config import Config
+from main import WeatherApp
+from metrics import MetricsRegistry
+from rate_limit import TokenBucket
+from weather_service import WeatherService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def app(page, mock_api, tmp_path, monkeypatch):
+    # History and caches are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    service = WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=TokenBucket(6000, 100),
+        metrics=MetricsRegistry(),
+    )
+    app = WeatherApp(page, weather_service=service)
+    await asyncio.sleep(0)  # Let the history load
+    yield app
+    for task in page.tasks:
+        task.cancel()
+    await service.aclose()
+
+
+async def search(app, city):
+    app.city_input.value = city
+    app.start_search()
+    await app._search_future
+
+
+async def test_search_shows_weather_and_forecast(app, page):
+    """A search renders both panels with few page updates."""
+    updates = page.updates
+    await search(app, "London")
+    assert app.weather_view.location.value == "London, GB"
+    assert app.weather_view.temperature.value == "14.2°C"
+    assert app.weather_container.visible
+    assert app.forecast_container.visible
+    assert all(card.visible for card in app.forecast_view.cards)
+    assert not app.loading.visible
+    assert page.updates - updates == 3
+
+
+async def test_search_records_history(app):
+    """Successful searches are added to the history with their city ID."""
+    await search(app, "London")
+    await search(app, "london")
+    entry = app.search_history[0]
+    assert entry.city_id == 2643743
+    assert entry.hits == 2
+
+
+async def test_unknown_city_shows_error(app):
+    """Test that an unknown city shows an error message."""
+    await search(app, "InvalidCityXYZ123")
+    assert app.error_message.visible
+    assert "not found" in app.error_message.value
+    assert not app.weather_container.visible
+    assert app.search_history == []
+
+
+async def test_typed_name_known_to_the_index_is_queried_by_id(app):
+    """Names in the offline index resolve to their city ID."""
+    # "Edo" is unknown to the API by name; only its ID (Tokyo's) can work
+    app.city_index = CityIndex([(1850147, "Edo", "", "JP", 1)])
+    await search(app, "edo")
+    assert app.weather_view.location.value == "Tokyo, JP"
+
+
+async def test_empty_input_shows_error(app, mock_api):
+    """Test that an empty search doesn't hit the API."""
+    await search(app, "  ")
+    assert app.error_message.visible
+    assert sum(mock_api.calls.values()) == 0
+
+
+async def test_forecast_error_keeps_current_weather(app, mock_api):
+    """A failed forecast doesn't hide the current conditions."""
+    del mock_api.fixtures["forecast"]["london"]
+    await search(app, "London")
+    assert app.weather_container.visible
+    assert app.forecast_view.message.visible
+    assert not app.error_message.visible
+
+
+async def test_toggle_units_converts_locally(app, page, mock_api):
+    """Switching units re-renders without new requests."""
+    await search(app, "London")
+    calls = sum(mock_api.calls.values())
+    updates = page.updates
+    app.toggle_units(None)
+    assert app.weather_view.temperature.value == "57.6°F"
+    assert sum(mock_api.calls.values()) == calls
+    assert page.updates - updates == 1
+
+
+async def test_latest_search_wins(app, mock_api):
+    """A slow earlier search never overwrites a newer one."""
+    mock_api.latency = 0.05
+    app.city_input.value = "London"
+    app.start_search()
+    first = app._search_future
+    await asyncio.sleep(0.01)
+    await search(app, "Tokyo")
+    await asyncio.gather(first, return_exceptions=True)
+    assert app.weather_view.location.value == "Tokyo, JP"
+
+
+async def test_search_is_instrumented(app):
+    """Searches record HTTP, parsing, render and page update timings."""
+    await search(app, "London")
+    series = {row["series"] for row in app.metrics.summary()}
+    assert "http_request{endpoint=weather,status=200}" in series
+    assert "json_decode{endpoint=forecast}" in series
+    assert "render{view=weather}" in series
+    assert "page_update" in series
+    assert "search{stage=forecast}" in series
+    text = app.metrics.to_prometheus()
+    assert 'weather_app_page_update_seconds_count 3' in text
+    assert 'weather_app_http_responses_total{endpoint="weather",status="200"} 1' in text
+
+
+async def test_missing_api_key_is_reported_on_search(page, tmp_path, monkeypatch):
+    """The app starts without a key and reports it when searching."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "_loaded", True)
+    monkeypatch.setattr(Config, "API_KEY", "")
+    app = WeatherApp(page)
+    assert app._weather_service is None
+    await search(app, "London")
+    assert "OPENWEATHER_API_KEY" in app.error_message.value
+    for task in page.tasks:
+        task.cancel()
+
+
+async def test_window_close_releases_the_client(app, page):
+    """Closing the desktop window closes the HTTP client before the window goes."""
+    await search(app, "London")
+    client = app.weather_service.client
+    assert page.window.prevent_close
+    await page.window.on_event(SimpleNamespace(type=ft.WindowEventType.CLOSE))
+    assert client.is_closed
+    assert page.window.destroyed
+
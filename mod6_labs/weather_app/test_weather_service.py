@@ -1,62 +1,196 @@
 # test_weather_service.py
-"""Simple tests for weather service."""
+"""Tests for the weather service, run against the offline mock API."""
 
 import asyncio
+
+import httpx
+import pytest
+
+from config import Config
+from json_decoding import available, get_decoder
+from rate_limit import TokenBucket
 from weather_service import WeatherService, WeatherServiceError
 
+pytestmark = pytest.mark.anyio
+
 
-async def test_valid_city():
+async def test_valid_city(service):
     """Test fetching weather for a valid city."""
-    service = WeatherService()
-    try:
-        data = await service.get_weather("London")
-        print(f"✅ Successfully fetched weather for {data['name']}")
-        print(f"   Temperature: {data['main']['temp']}°C")
-        return True
-    except Exception as e:
-        print(f"❌ Test failed: {e}")
-        return False
-
-
-async def test_invalid_city():
+    data = await service.get_weather("London")
+    assert data.city_name == "London"
+    assert data.country == "GB"
+    assert data.temp == pytest.approx(14.2)
+
+
+async def test_invalid_city(service):
     """Test handling of invalid city."""
-    service = WeatherService()
-    try:
+    with pytest.raises(WeatherServiceError, match="not found"):
         await service.get_weather("InvalidCityXYZ123")
-        print("❌ Should have raised an error")
-        return False
-    except WeatherServiceError as e:
-        print(f"✅ Correctly handled error: {e}")
-        return True
 
 
-async def test_empty_city():
+async def test_empty_city(service):
     """Test handling of empty city name."""
-    service = WeatherService()
-    try:
+    with pytest.raises(WeatherServiceError, match="empty"):
         await service.get_weather("")
-        print("❌ Should have raised an error")
-        return False
-    except WeatherServiceError as e:
-        print(f"✅ Correctly handled error: {e}")
-        return True
-
-
-async def run_tests():
-    """Run all tests."""
-    print("Running Weather Service Tests\n")
-    print("=" * 50)
-    
-    results = []
-    results.append(await test_valid_city())
-    results.append(await test_invalid_city())
-    results.append(await test_empty_city())
-    
-    print("\n" + "=" * 50)
-    passed = sum(results)
-    total = len(results)
-    print(f"\nTests Passed: {passed}/{total}")
-
-
-if __name__ == "__main__":
-    asyncio.run(run_tests())
\ No newline at end of file
+
+
+async def test_city_id_and_coordinates(service):
+    """Cities can also be looked up by ID and by coordinates."""
+    by_id = await service.get_weather(1850147)
+    by_coordinates = await service.get_weather_by_coordinates(35.68, 139.69)
+    assert by_id.city_name == by_coordinates.city_name == "Tokyo"
+
+
+async def test_forecast(service):
+    """Test fetching the 5-day forecast."""
+    forecast = await service.get_forecast("London")
+    assert forecast.city_name == "London"
+    assert len(forecast) == 40
+
+
+async def test_units_are_converted_locally(service, mock_api):
+    """Other units come from the cached canonical response."""
+    metric = await service.get_weather("London")
+    imperial = await service.get_weather("London", units="imperial")
+    assert imperial.temp == pytest.approx(metric.temp * 9 / 5 + 32)
+    assert mock_api.calls["weather"] == 1
+
+
+async def test_repeated_lookups_are_cached(service, mock_api):
+    """Test that a second lookup is served from the cache."""
+    await service.get_weather("London")
+    await service.get_weather("london")
+    assert mock_api.calls["weather"] == 1
+
+
+async def test_concurrent_lookups_share_one_request(mock_api):
+    """Identical in-flight requests are coalesced."""
+    mock_api.latency = 0.05
+    async with WeatherService(transport=mock_api.transport) as service:
+        results = await asyncio.gather(*(service.get_weather("Tokyo") for _ in range(10)))
+    assert {r.city_name for r in results} == {"Tokyo"}
+    assert mock_api.calls["weather"] == 1
+
+
+async def test_bundle(service, mock_api):
+    """Weather and forecast are fetched together."""
+    bundle = await service.get_bundle("Tokyo")
+    assert bundle["weather"].city_name == "Tokyo"
+    assert len(bundle["forecast"]) == 40
+    assert bundle["forecast_error"] is None
+
+
+async def test_batch_by_id_uses_group_endpoint(service, mock_api):
+    """City IDs are collapsed into one group request."""
+    results = await service.get_weather_many([2643743, 1850147, 2643743, 42])
+    assert [r.city_name for r in results[:3]] == ["London", "Tokyo", "London"]
+    assert isinstance(results[3], WeatherServiceError)
+    assert mock_api.calls == {"group": 1}
+
+
+async def test_rate_limited_requests_are_retried(mock_api):
+    """429 responses are retried, then reported."""
+    mock_api.rate_limit_rate = 1.0
+    mock_api.retry_after = 0
+    async with WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=TokenBucket(6000, 100),
+        max_retries=2,
+    ) as service:
+        with pytest.raises(WeatherServiceError, match="Too many requests"):
+            await service.get_weather("London")
+        assert service.request_stats["rate_limited"] == 3
+    assert mock_api.calls["weather"] == 3
+
+
+async def test_long_retry_after_is_capped(mock_api):
+    """A huge Retry-After pauses the shared bucket for at most RETRY_AFTER_MAX."""
+    mock_api.rate_limit_rate = 1.0
+    mock_api.retry_after = 86400
+    bucket = TokenBucket(6000, 100, clock=lambda: 1000.0)
+    async with WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=bucket,
+        max_retries=0,
+    ) as service:
+        with pytest.raises(WeatherServiceError, match="Too many requests"):
+            await service.get_weather("London")
+    assert bucket._paused_until == 1000.0 + Config.RETRY_AFTER_MAX
+
+
+async def test_retry_after_is_honored_on_503(mock_api):
+    """A 503 with Retry-After waits that long instead of the computed backoff."""
+    mock_api.error_rate = 1.0
+    mock_api.error_retry_after = 7
+    delays = []
+
+    async def record_delay(attempt, retry_after=None):
+        delays.append(retry_after)
+
+    async with WeatherService(transport=mock_api.transport, max_retries=2) as service:
+        service._sleep_before_retry = record_delay
+        with pytest.raises(WeatherServiceError, match="unavailable"):
+            await service.get_weather("London")
+    assert delays == [7.0, 7.0]
+
+
+async def test_flaky_server_recovers(mock_api):
+    """Intermittent 503s succeed after retrying."""
+    mock_api.error_rate = 0.5
+    async with WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=TokenBucket(6000, 100),
+        max_retries=10,
+    ) as service:
+        for city in ("London", "Tokyo"):
+            assert (await service.get_weather(city)).city_name == city
+    assert mock_api.statuses[200] == 2
+
+
+async def test_server_error(mock_api):
+    """Test handling of a failing server."""
+    mock_api.error_rate = 1.0
+    async with WeatherService(transport=mock_api.transport, max_retries=1) as service:
+        with pytest.raises(WeatherServiceError, match="unavailable"):
+            await service.get_weather("London")
+
+
+async def test_timeout(mock_api):
+    """Test handling of requests that time out."""
+    mock_api.timeout_rate = 1.0
+    async with WeatherService(transport=mock_api.transport, max_retries=1) as service:
+        with pytest.raises(WeatherServiceError, match="timed out"):
+            await service.get_weather("London")
+
+
+async def test_invalid_api_key(service):
+    """Test handling of a missing API key."""
+    service.api_key = ""
+    with pytest.raises(WeatherServiceError, match="Invalid API key"):
+        await service.get_weather("London")
+
+
+@pytest.mark.parametrize("name", available())
+async def test_json_decoders(mock_api, name):
+    """Every installed decoder produces the same models."""
+    async with WeatherService(
+        transport=mock_api.transport,
+        decoder=get_decoder(name),
+    ) as service:
+        forecast = await service.get_forecast("London")
+    assert len(forecast) == 40
+    assert forecast.city_name == "London"
+
+
+async def test_invalid_json():
+    """Test handling of a response body that isn't JSON."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html>"))
+    async with WeatherService(transport=transport) as service:
+        with pytest.raises(WeatherServiceError, match="Invalid JSON"):
+            await service.get_weather("London")
+
+
+def test_unknown_decoder():
+    """Test that a misspelled decoder name is rejected."""
+    with pytest.raises(ValueError, match="Unknown JSON decoder"):
+        get_decoder("simdjson")
@@ -0,0 +1,131 @@
+# test_weather_store.py
+"""Tests for the persistent response store and the service's use of it."""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from config import Config
+from metrics import MetricsRegistry
+from rate_limit import TokenBucket
+from weather_service import WeatherService
+from weather_store import WeatherStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "weather_cache.db")
+
+
+@pytest.fixture
+def store(store_path):
+    store = WeatherStore(store_path)
+    yield store
+    store.close()
+
+
+def age_all_entries(path, seconds):
+    """Pretend every stored response was fetched seconds ago."""
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE responses SET fetched_at = ?", (time.time() - seconds,))
+    conn.close()
+
+
+def stored_fetch_times(path):
+    conn = sqlite3.connect(path)
+    times = [row[0] for row in conn.execute("SELECT fetched_at FROM responses")]
+    conn.close()
+    return times
+
+
+async def fetch_london(mock_api, path):
+    """Look up London through a fresh service backed by the store at path."""
+    metrics = MetricsRegistry()
+    async with WeatherService(
+        transport=mock_api.transport,
+        rate_limiter=TokenBucket(6000, 100),
+        store=WeatherStore(path),
+        metrics=metrics,
+    ) as service:
+        data = await service.get_weather("London")
+        # Let background revalidations finish before the store closes
+        await asyncio.gather(*service._background_tasks)
+    return data, metrics
+
+
+def test_put_and_get(store):
+    """Payloads round-trip with their fetch time and can be replaced."""
+    key = ("weather", "london", "metric")
+    assert store.get(key) is None
+    store.put(key, {"name": "London"}, fetched_at=100.0)
+    assert store.get(key) == ({"name": "London"}, 100.0)
+    store.put(key, {"name": "London", "v": 2})
+    payload, fetched_at = store.get(key)
+    assert payload["v"] == 2
+    assert fetched_at == pytest.approx(time.time(), abs=5)
+    assert len(store) == 1
+
+
+def test_compact_drops_expired_and_excess_entries(store_path):
+    """Entries past max_age go first, then the oldest beyond max_entries."""
+    store = WeatherStore(store_path, max_entries=3, max_age=60)
+    now = time.time()
+    store.put("expired", {}, fetched_at=now - 120)
+    for i in range(5):
+        store.put(f"fresh-{i}", {}, fetched_at=now - i)
+    assert store.compact() == 3
+    assert [store.get(f"fresh-{i}") is not None for i in range(5)] == [True] * 3 + [False] * 2
+    assert store.get("expired") is None
+    store.close()
+
+
+def test_compact_shrinks_the_file(store_path):
+    """Deleting most rows gives their pages back instead of keeping them free."""
+    store = WeatherStore(store_path, max_entries=5)
+    payload = {"blob": "x" * 4000}
+    for i in range(500):
+        store.put(f"city-{i}", payload, fetched_at=time.time() + i)
+    pages = store.page_count()
+
+    assert store.compact() == 495
+    assert store.page_count() < pages / 10
+    with sqlite3.connect(store_path) as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    conn.close()
+    store.close()
+
+
+async def test_fresh_store_entry_skips_the_api(mock_api, store_path):
+    """A restarted service answers from the store while the entry is fresh."""
+    await fetch_london(mock_api, store_path)
+    data, metrics = await fetch_london(mock_api, store_path)
+    assert data.city_name == "London"
+    assert metrics.counter("cache_lookups", endpoint="weather", result="store") == 1
+    assert mock_api.calls["weather"] == 1
+
+
+async def test_expired_entry_is_served_stale_and_revalidated(mock_api, store_path):
+    """Past its TTL, the stored copy is returned at once and refreshed in the background."""
+    await fetch_london(mock_api, store_path)
+    age_all_entries(store_path, Config.CACHE_TTL_WEATHER + 60)
+
+    data, metrics = await fetch_london(mock_api, store_path)
+    assert data.city_name == "London"
+    assert metrics.counter("cache_lookups", endpoint="weather", result="stale") == 1
+    assert mock_api.calls["weather"] == 2
+    # The revalidation rewrote the entry, so it is fresh again
+    assert all(time.time() - t < 60 for t in stored_fetch_times(store_path))
+
+
+async def test_entry_past_stale_limit_is_refetched(mock_api, store_path):
+    """Entries too old to serve even stale are fetched before answering."""
+    await fetch_london(mock_api, store_path)
+    age_all_entries(store_path, Config.CACHE_STALE_MAX_AGE + 60)
+
+    _, metrics = await fetch_london(mock_api, store_path)
+    assert metrics.counter("cache_lookups", endpoint="weather", result="miss") == 1
+    assert mock_api.calls["weather"] == 2
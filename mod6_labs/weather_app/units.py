@@ -0,0 +1,82 @@
+# units.py
+"""Client-side unit conversion for weather data.
+
+Weather is always fetched in one canonical unit system (``Config.UNITS``)
+and converted locally, so switching between °C and °F never needs a
+network round trip. The weather models build converted copies with these
+functions (see ``CurrentWeather.to_units``/``Forecast.to_units``) and never
+touch the cached originals, which keeps them safe under concurrent tasks.
+"""
+
+UNIT_SYSTEMS = ("metric", "imperial", "standard")
+
+MPS_TO_MPH = 2.2369362920544
+HPA_TO_INHG = 0.0295299830714
+
+_TEMPERATURE_SYMBOLS = {"metric": "°C", "imperial": "°F", "standard": "K"}
+_SPEED_LABELS = {"metric": "m/s", "imperial": "mph", "standard": "m/s"}
+_PRESSURE_LABELS = {"metric": "hPa", "imperial": "inHg", "standard": "hPa"}
+
+
+def _check(units: str):
+    if units not in UNIT_SYSTEMS:
+        raise ValueError(f"Unknown unit system: {units}")
+
+
+def convert_temperature(value: float, from_units: str, to_units: str) -> float:
+    """Convert a temperature between unit systems."""
+    _check(from_units)
+    _check(to_units)
+    if from_units == to_units:
+        return value
+
+    # Normalize to Celsius first
+    if from_units == "imperial":
+        celsius = (value - 32) * 5 / 9
+    elif from_units == "standard":
+        celsius = value - 273.15
+    else:
+        celsius = value
+
+    if to_units == "imperial":
+        return celsius * 9 / 5 + 32
+    if to_units == "standard":
+        return celsius + 273.15
+    return celsius
+
+
+def convert_speed(value: float, from_units: str, to_units: str) -> float:
+    """Convert a wind speed between m/s (metric/standard) and mph (imperial)."""
+    _check(from_units)
+    _check(to_units)
+    from_imperial = from_units == "imperial"
+    to_imperial = to_units == "imperial"
+    if from_imperial == to_imperial:
+        return value
+    return value * MPS_TO_MPH if to_imperial else value / MPS_TO_MPH
+
+
+def convert_pressure(value: float, from_units: str, to_units: str) -> float:
+    """Convert a pressure between hPa (metric/standard) and inHg (imperial)."""
+    _check(from_units)
+    _check(to_units)
+    from_imperial = from_units == "imperial"
+    to_imperial = to_units == "imperial"
+    if from_imperial == to_imperial:
+        return value
+    return value * HPA_TO_INHG if to_imperial else value / HPA_TO_INHG
+
+
+def temperature_symbol(units: str) -> str:
+    """Display symbol for temperatures, e.g. "°C"."""
+    return _TEMPERATURE_SYMBOLS[units]
+
+
+def speed_label(units: str) -> str:
+    """Display label for wind speeds, e.g. "m/s"."""
+    return _SPEED_LABELS[units]
+
+
+def pressure_label(units: str) -> str:
+    """Display label for pressures, e.g. "hPa"."""
+    return _PRESSURE_LABELS[units]
@@ -1,9 +1,16 @@
 # weather_service.py
 """Weather API service layer."""
 
+import asyncio
+import time
 import httpx
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from cache import Location, TTLCache, make_key
 from config import Config
+from json_decoding import JSONDecoder, get_decoder
+from metrics import REGISTRY, MetricsRegistry
+from models import CurrentWeather, Forecast
+from rate_limit import TokenBucket, backoff_delay, parse_retry_after
 
 
 class WeatherServiceError(Exception):
@@ -11,51 +18,346 @@ class WeatherServiceError(Exception):
     pass
 
 
+def _http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
-    
-    def __init__(self):
+    """Service for fetching weather data from OpenWeatherMap API.
+
+    The service owns a single pooled ``httpx.AsyncClient`` that is reused
+    by every request, so DNS, TCP and TLS setup is only paid once per
+    connection instead of once per lookup. Call ``aclose()`` (or use the
+    service as an async context manager) when the app shuts down.
+
+    Responses are kept in an in-memory cache (a bounded LRU with
+    per-endpoint TTLs by default). Any object with ``get``/``set``/
+    ``stats`` can be passed as ``cache``, e.g. ``NullCache()`` to disable it.
+
+    An optional persistent ``store`` (see ``WeatherStore``) backs the
+    memory cache across restarts. Stored payloads past their TTL are still
+    returned immediately (stale-while-revalidate) while a fresh copy is
+    fetched in the background.
+
+    Concurrent identical requests are coalesced: only one upstream call
+    is made and its result is shared by every awaiter.
+
+    Response bodies are decoded from bytes by a pluggable JSON ``decoder``
+    (orjson or msgspec when installed, see ``json_decoding``) and parsed
+    once into ``CurrentWeather``/``Forecast`` models, which is also what
+    the memory cache holds. Data is always fetched and cached in the
+    canonical ``Config.UNITS``; passing ``units`` to a getter converts the
+    result locally.
+
+    All requests share one adaptive token-bucket ``rate_limiter`` that
+    keeps the app within the API's per-minute quota. Idempotent GETs are
+    retried on 429, 5xx, timeouts and network errors with jittered
+    exponential backoff (or the server's ``Retry-After``). Counters are
+    available as ``request_stats``.
+
+    Timings are recorded in a ``MetricsRegistry`` (the shared ``REGISTRY``
+    by default): each HTTP attempt and its connection phases (TCP connect
+    including DNS, TLS, waiting for the response) via httpx event hooks
+    and request tracing, plus JSON decoding and model parsing.
+    """
+
+    _models = {"weather": CurrentWeather, "forecast": Forecast}
+
+    def __init__(
+        self,
+        max_connections: int = Config.MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = Config.KEEPALIVE_EXPIRY,
+        http2: Optional[bool] = None,
+        cache=None,
+        store=None,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = Config.MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        decoder: Optional[JSONDecoder] = None,
+    ):
+        Config.load()
         self.api_key = Config.API_KEY
         self.base_url = Config.BASE_URL
+        self.forecast_url = Config.FORECAST_URL
+        self.group_url = Config.GROUP_URL
         self.timeout = Config.TIMEOUT
-    
-    async def get_weather(self, city: str) -> Dict:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1
+        if http2 is None:
+            http2 = Config.HTTP2
+        self.http2 = http2 and _http2_available()
+        self.transport = transport  # e.g. MockOpenWeatherMap().transport in tests
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache if cache is not None else TTLCache(Config.CACHE_MAX_ENTRIES)
+        self.ttls = {
+            "weather": Config.CACHE_TTL_WEATHER,
+            "forecast": Config.CACHE_TTL_FORECAST,
+        }
+        self.store = store
+        self._store_writes = 0
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.rate_limiter = rate_limiter or TokenBucket(
+            Config.RATE_LIMIT_PER_MINUTE, Config.RATE_LIMIT_BURST
+        )
+        self.max_retries = max_retries
+        self._request_stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+        self._background_tasks = set()
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self.decoder = decoder or get_decoder(Config.JSON_DECODER)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection-pooled HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+                event_hooks={
+                    "request": [self._on_request],
+                    "response": [self._on_response],
+                },
+            )
+        return self._client
+
+    @staticmethod
+    def _endpoint(url) -> str:
+        """Short endpoint name for metric labels ("weather", "forecast", ...)."""
+        return str(url).split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+    async def _on_request(self, request: httpx.Request):
+        """Start timing a request and trace its connection phases."""
+        started = {}
+        endpoint = self._endpoint(request.url)
+
+        async def trace(event: str, info: Dict):
+            # httpcore reports "<phase>.started" / "<phase>.complete" pairs
+            step, _, state = event.rpartition(".")
+            if state == "started":
+                started[step] = time.perf_counter()
+            elif state == "complete" and step in started:
+                self.metrics.observe(
+                    "http_phase",
+                    time.perf_counter() - started.pop(step),
+                    endpoint=endpoint,
+                    phase=step.rsplit(".", 1)[-1],
+                )
+
+        request.extensions["trace"] = trace
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response):
+        """Record the time until the response headers arrived."""
+        request = response.request
+        start = request.extensions.get("metrics_start")
+        if start is None:
+            return
+        labels = {
+            "endpoint": self._endpoint(request.url),
+            "status": response.status_code,
+        }
+        self.metrics.observe("http_request", time.perf_counter() - start, **labels)
+        self.metrics.increment("http_responses", **labels)
+
+    async def aclose(self):
+        """Close the pooled HTTP client, background tasks and the store."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hit/miss/eviction counters."""
+        return self.cache.stats
+
+    @property
+    def request_stats(self) -> Dict[str, int]:
+        """Request, retry, 429 and throttling counters."""
+        return {**self._request_stats, "throttled": self.rate_limiter.throttled}
+
+    async def _cached_request(
+        self,
+        endpoint: str,
+        location: Location,
+        params: Dict,
+        city: str = "",
+    ):
+        """Serve a request from the cache, fetching and storing it on a miss."""
+        key = make_key(endpoint, location, params["units"])
+        data = self.cache.get(key)
+        if data is not None:
+            self.metrics.increment("cache_lookups", endpoint=endpoint, result="hit")
+            return data
+
+        if self.store is not None:
+            record = await asyncio.to_thread(self.store.get, key)
+            if record is not None:
+                raw, fetched_at = record
+                data = self._parse(endpoint, raw, params["units"])
+                age = time.time() - fetched_at
+                ttl = self.ttls[endpoint]
+                if age < ttl:
+                    self.cache.set(key, data, ttl - age)
+                    self.metrics.increment("cache_lookups", endpoint=endpoint, result="store")
+                    return data
+                if age < Config.CACHE_STALE_MAX_AGE:
+                    # Serve the stale copy and refresh it in the background
+                    self._fetch_shared(endpoint, key, params, city)
+                    self.metrics.increment("cache_lookups", endpoint=endpoint, result="stale")
+                    return data
+
+        self.metrics.increment("cache_lookups", endpoint=endpoint, result="miss")
+
+        # Shield the shared fetch so one cancelled caller doesn't cancel it
+        # for everyone else waiting on the same request
+        return await asyncio.shield(self._fetch_shared(endpoint, key, params, city))
+
+    def _fetch_shared(
+        self,
+        endpoint: str,
+        key,
+        params: Dict,
+        city: str = "",
+    ) -> asyncio.Task:
+        """Return the in-flight fetch for key, starting one if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._spawn(self._fetch(endpoint, key, params, city))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch(self, endpoint: str, key, params: Dict, city: str = ""):
+        """Fetch from the API and write the result to the cache and store."""
+        url = self.forecast_url if endpoint == "forecast" else self.base_url
+        raw = await self._request(url, params, city=city)
+        data = self._parse(endpoint, raw, params["units"])
+        await self._remember(endpoint, key, data, raw)
+        return data
+
+    def _parse(self, endpoint: str, raw: Dict, units: str):
+        """Parse a raw payload into the model for its endpoint."""
+        try:
+            with self.metrics.span("parse", endpoint=endpoint):
+                return self._models[endpoint].from_json(raw, units)
+        except ValueError as e:
+            raise WeatherServiceError(
+                f"Unexpected response from weather service: {str(e)}"
+            )
+
+    async def _remember(self, endpoint: str, key, data, raw: Dict):
+        """Write a fresh response to the memory cache and persistent store."""
+        self.cache.set(key, data, self.ttls[endpoint])
+
+        if self.store is not None:
+            # The store keeps the raw JSON so it survives model changes
+            await asyncio.to_thread(self.store.put, key, raw)
+            self._store_writes += 1
+            if self._store_writes % Config.CACHE_DB_COMPACT_EVERY == 0:
+                self._spawn(asyncio.to_thread(self.store.compact))
+
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference to it."""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task):
+        """Forget a finished background task and mark its error as handled."""
+        self._background_tasks.discard(task)
+        if not task.cancelled():
+            # Awaiters (if any) receive the error themselves; failed
+            # revalidations just keep the stale copy
+            task.exception()
+
+    async def _request(self, url: str, params: Dict, city: str = "") -> Dict:
         """
-        Fetch weather data for a given city.
-        
+        Send a GET request through the pooled client.
+
         Args:
-            city: Name of the city
-            
+            url: Endpoint URL
+            params: Query parameters (the API key is added here)
+            city: City name used in the "not found" error message
+
         Returns:
-            Dictionary containing weather data
-            
+            Decoded JSON response
+
         Raises:
             WeatherServiceError: If the request fails
         """
-        if not city:
-            raise WeatherServiceError("City name cannot be empty")
-        
-        # Build request parameters
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": Config.UNITS,
-        }
-        
-        try:
-            # Make async HTTP request
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                
+        params = {**params, "appid": self.api_key}
+        attempt = 0
+
+        while True:
+            await self.rate_limiter.acquire()
+            self._request_stats["requests"] += 1
+            try:
+                response = await self.client.get(url, params=params)
+
+                retryable = response.status_code == 429 or response.status_code >= 500
+
+                # 429s and 5xx (e.g. 503 during maintenance) may say when to retry
+                retry_after = None
+                if retryable:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        # Neither the retry wait nor the shared pause may
+                        # outlast RETRY_AFTER_MAX
+                        retry_after = min(retry_after, Config.RETRY_AFTER_MAX)
+
+                # Throttle everyone on 429, recover slowly on success
+                if response.status_code == 429:
+                    self._request_stats["rate_limited"] += 1
+                    self.rate_limiter.penalize(retry_after)
+                elif response.status_code == 200:
+                    self.rate_limiter.reward()
+
+                if retryable and attempt < self.max_retries:
+                    attempt += 1
+                    await self._sleep_before_retry(attempt, retry_after)
+                    continue
+
                 # Check for HTTP errors
                 if response.status_code == 404:
-                    raise WeatherServiceError(
-                        f"City '{city}' not found. Please check the spelling."
-                    )
+                    if city:
+                        raise WeatherServiceError(
+                            f"City '{city}' not found. Please check the spelling."
+                        )
+                    raise WeatherServiceError("Location not found.")
                 elif response.status_code == 401:
                     raise WeatherServiceError(
                         "Invalid API key. Please check your configuration."
                     )
+                elif response.status_code == 429:
+                    raise WeatherServiceError(
+                        "Too many requests. Please wait a moment and try again."
+                    )
                 elif response.status_code >= 500:
                     raise WeatherServiceError(
                         "Weather service is currently unavailable. "
@@ -65,79 +367,306 @@ class WeatherService:
                     raise WeatherServiceError(
                         f"Error fetching weather data: {response.status_code}"
                     )
-                
-                # Parse JSON response
-                data = response.json()
-                return data
-                
-        except httpx.TimeoutException:
-            raise WeatherServiceError(
-                "Request timed out. Please check your internet connection."
-            )
-        except httpx.NetworkError:
-            raise WeatherServiceError(
-                "Network error. Please check your internet connection."
-            )
-        except httpx.HTTPError as e:
-            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
-        except Exception as e:
-            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
-    
+
+                # Decode the body bytes directly (orjson/msgspec when installed)
+                try:
+                    with self.metrics.span("json_decode", endpoint=self._endpoint(url)):
+                        return self.decoder.loads(response.content)
+                except ValueError as e:
+                    raise WeatherServiceError(
+                        f"Unexpected response from weather service: {str(e)}"
+                    )
+
+            except WeatherServiceError:
+                raise
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                self.metrics.increment("http_errors", error=type(e).__name__)
+                if attempt < self.max_retries:
+                    attempt += 1
+                    await self._sleep_before_retry(attempt)
+                    continue
+                if isinstance(e, httpx.TimeoutException):
+                    raise WeatherServiceError(
+                        "Request timed out. Please check your internet connection."
+                    )
+                raise WeatherServiceError(
+                    "Network error. Please check your internet connection."
+                )
+            except httpx.HTTPError as e:
+                raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
+            except Exception as e:
+                raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
+
+    async def _sleep_before_retry(self, attempt: int, retry_after: Optional[float] = None):
+        """Wait before a retry: the server's Retry-After, else jittered backoff."""
+        self._request_stats["retries"] += 1
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = backoff_delay(attempt, Config.RETRY_BACKOFF_BASE, Config.RETRY_BACKOFF_MAX)
+        await asyncio.sleep(delay)
+
+    @staticmethod
+    def _location_params(city: Union[str, int]) -> Dict:
+        """Query parameters selecting a city by name or by numeric ID."""
+        if isinstance(city, int):
+            return {"id": city}
+        return {"q": city}
+
+    async def get_weather(
+        self,
+        city: Union[str, int],
+        units: Optional[str] = None,
+    ) -> CurrentWeather:
+        """
+        Fetch weather data for a given city.
+
+        Args:
+            city: Name of the city, or its OpenWeatherMap city ID
+            units: Unit system of the result (defaults to Config.UNITS)
+
+        Returns:
+            Parsed current weather
+
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        if not city and city != 0:
+            raise WeatherServiceError("City name cannot be empty")
+
+        # Build request parameters
+        params = {
+            **self._location_params(city),
+            "units": Config.UNITS,
+        }
+        data = await self._cached_request("weather", city, params, city=str(city))
+        return data.to_units(units) if units else data
+
     async def get_weather_by_coordinates(
-        self, 
-        lat: float, 
-        lon: float
-    ) -> Dict:
+        self,
+        lat: float,
+        lon: float,
+        units: Optional[str] = None,
+    ) -> CurrentWeather:
         """
         Fetch weather data by coordinates.
-        
+
         Args:
             lat: Latitude
             lon: Longitude
-            
+            units: Unit system of the result (defaults to Config.UNITS)
+
         Returns:
-            Dictionary containing weather data
+            Parsed current weather
         """
         params = {
             "lat": lat,
             "lon": lon,
-            "appid": self.api_key,
             "units": Config.UNITS,
         }
-        
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                return response.json()
-                
-        except Exception as e:
-            raise WeatherServiceError(f"Error fetching weather data: {str(e)}")
-
-    async def get_forecast(self, city: str) -> dict:
-        """Get 5-day forecast."""
-        forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
+        data = await self._cached_request("weather", (lat, lon), params)
+        return data.to_units(units) if units else data
+
+    async def get_forecast(
+        self,
+        city: Union[str, int],
+        units: Optional[str] = None,
+    ) -> Forecast:
+        """Get 5-day forecast, optionally converted to another unit system."""
+        if not city and city != 0:
+            raise WeatherServiceError("City name cannot be empty")
+
         params = {
-            "q": city,
-            "appid": self.api_key,
+            **self._location_params(city),
             "units": Config.UNITS,
         }
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(forecast_url, params=params)
-            response.raise_for_status()
-            return response.json()
-    
-    async def get_weather_by_coordinates(self, lat: float, lon: float) -> dict:
-        """Get weather by coordinates."""
+        data = await self._cached_request("forecast", city, params, city=str(city))
+        return data.to_units(units) if units else data
+
+    def peek_weather(
+        self,
+        city: Union[str, int],
+        units: Optional[str] = None,
+    ) -> Optional[CurrentWeather]:
+        """Return cached current weather for a city without any I/O, or None."""
+        data = self.cache.peek(make_key("weather", city, Config.UNITS))
+        if data is None:
+            return None
+        return data.to_units(units) if units else data
+
+    async def prefetch(self, city: Union[str, int]) -> CurrentWeather:
+        """
+        Refresh a city's current weather in the cache, ignoring any cached copy.
+
+        The forecast is fetched as well when it is not already cached; a
+        forecast failure is ignored.
+
+        Args:
+            city: Name of the city, or its OpenWeatherMap city ID
+
+        Returns:
+            Fresh current weather
+
+        Raises:
+            WeatherServiceError: If the current weather request fails
+        """
         params = {
-            "lat": lat,
-            "lon": lon,
-            "appid": self.api_key,
+            **self._location_params(city),
             "units": Config.UNITS,
         }
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
\ No newline at end of file
+        key = make_key("weather", city, Config.UNITS)
+        weather = await asyncio.shield(
+            self._fetch_shared("weather", key, params, city=str(city))
+        )
+        try:
+            await self.get_forecast(city)
+        except WeatherServiceError:
+            pass
+        return weather
+
+    def start_bundle(self, city: Union[str, int]) -> Tuple[asyncio.Task, asyncio.Task]:
+        """
+        Start current weather and forecast requests concurrently.
+
+        Callers that want to render each part as soon as it arrives can
+        await the two tasks separately.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            (weather_task, forecast_task)
+        """
+        return (
+            asyncio.ensure_future(self.get_weather(city)),
+            asyncio.ensure_future(self.get_forecast(city)),
+        )
+
+    async def get_bundle(self, city: Union[str, int]) -> Dict:
+        """
+        Fetch current weather and forecast for a city concurrently.
+
+        A forecast failure does not hide the current weather: it is
+        returned under "forecast_error" instead of being raised.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            Dictionary with "weather", "forecast" and "forecast_error" keys
+
+        Raises:
+            WeatherServiceError: If the current weather request fails
+        """
+        weather_task, forecast_task = self.start_bundle(city)
+        try:
+            weather = await weather_task
+        except BaseException:
+            forecast_task.cancel()
+            raise
+
+        forecast, forecast_error = None, None
+        try:
+            forecast = await forecast_task
+        except WeatherServiceError as e:
+            forecast_error = e
+        return {
+            "weather": weather,
+            "forecast": forecast,
+            "forecast_error": forecast_error,
+        }
+
+    async def get_weather_many(
+        self,
+        cities: Sequence[Union[str, int]],
+        max_concurrency: int = Config.BATCH_MAX_CONCURRENCY,
+        use_group: bool = True,
+    ) -> List[Union[CurrentWeather, WeatherServiceError]]:
+        """
+        Fetch current weather for many cities at once.
+
+        Identical lookups are only requested once, and at most
+        ``max_concurrency`` requests are in flight at any time. Cities
+        given as numeric IDs are collapsed into group-by-id requests
+        (up to ``Config.GROUP_MAX_IDS`` per request) when ``use_group``
+        is set.
+
+        Args:
+            cities: City names and/or OpenWeatherMap city IDs
+            max_concurrency: Maximum number of concurrent requests
+            use_group: Use the group endpoint for city IDs
+
+        Returns:
+            One entry per input city, in input order: the weather data,
+            or the WeatherServiceError raised for that city
+        """
+        units = Config.UNITS
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        # Deduplicate: each unique key maps to the input positions using it
+        positions: Dict[Tuple, List[int]] = {}
+        lookups: Dict[Tuple, Union[str, int]] = {}
+        for index, city in enumerate(cities):
+            key = make_key("weather", city, units)
+            positions.setdefault(key, []).append(index)
+            lookups.setdefault(key, city)
+
+        outcomes: Dict[Tuple, Union[CurrentWeather, WeatherServiceError]] = {}
+
+        async def fetch_one(key, city):
+            async with semaphore:
+                try:
+                    outcomes[key] = await self.get_weather(city)
+                except WeatherServiceError as e:
+                    outcomes[key] = e
+
+        async def fetch_group(ids: List[int]):
+            async with semaphore:
+                try:
+                    data = await self._request(
+                        self.group_url,
+                        {"id": ",".join(str(i) for i in ids), "units": units},
+                    )
+                except WeatherServiceError as e:
+                    for city_id in ids:
+                        outcomes[make_key("weather", city_id, units)] = e
+                    return
+
+            found = {item.get("id"): item for item in data.get("list", [])}
+            for city_id in ids:
+                key = make_key("weather", city_id, units)
+                if city_id in found:
+                    try:
+                        weather = self._parse("weather", found[city_id], units)
+                    except WeatherServiceError as e:
+                        outcomes[key] = e
+                        continue
+                    outcomes[key] = weather
+                    await self._remember("weather", key, weather, found[city_id])
+                else:
+                    outcomes[key] = WeatherServiceError(
+                        f"City ID {city_id} not found."
+                    )
+
+        jobs = []
+        group_ids = []
+        for key, city in lookups.items():
+            cached = self.cache.get(key)
+            if cached is not None:
+                outcomes[key] = cached
+            elif use_group and isinstance(city, int):
+                group_ids.append(city)
+            else:
+                jobs.append(fetch_one(key, city))
+
+        step = Config.GROUP_MAX_IDS
+        for start in range(0, len(group_ids), step):
+            jobs.append(fetch_group(group_ids[start:start + step]))
+
+        await asyncio.gather(*jobs)
+
+        results: List[Union[CurrentWeather, WeatherServiceError]] = [None] * len(cities)
+        for key, indexes in positions.items():
+            for index in indexes:
+                results[index] = outcomes[key]
+        return results
@@ -0,0 +1,136 @@
+# weather_store.py
+"""Persistent SQLite store for raw weather API responses."""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from config import Config
+
+
+class WeatherStore:
+    """
+    On-disk cache of raw JSON payloads with their fetch timestamps.
+
+    The store survives restarts, so a cold-started app can show the last
+    known weather immediately. Size is kept in check by ``compact()``,
+    which drops entries older than ``max_age`` and trims the table to
+    ``max_entries`` (oldest first), then returns freed pages to the OS.
+
+    Methods are blocking; the weather service calls them through
+    ``asyncio.to_thread`` so the UI event loop never waits on disk I/O.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.CACHE_DB_PATH,
+        max_entries: int = Config.CACHE_DB_MAX_ENTRIES,
+        max_age: float = Config.CACHE_DB_MAX_AGE,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Must be set before the first table is created to take effect
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+            )
+            ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_fetched_at "
+            "ON responses (fetched_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key)
+
+    def get(self, key: Hashable) -> Optional[Tuple[Dict, float]]:
+        """Return (payload, fetched_at) for key, or None if not stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM responses WHERE key = ?",
+                (self._encode_key(key),),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: Hashable, payload: Dict, fetched_at: Optional[float] = None):
+        """Store a payload, replacing any previous one for the same key."""
+        if fetched_at is None:
+            fetched_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, fetched_at) "
+                "VALUES (?, ?, ?)",
+                (self._encode_key(key), json.dumps(payload), fetched_at),
+            )
+            self._conn.commit()
+
+    def compact(self) -> int:
+        """
+        Remove expired and excess entries.
+
+        Returns:
+            Number of rows deleted
+        """
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (cutoff,)
+            ).rowcount
+            deleted += self._conn.execute(
+                '''
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses
+                    ORDER BY fetched_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                ''',
+                (self.max_entries,),
+            ).rowcount
+            self._conn.commit()
+            if deleted:
+                self._reclaim_free_pages()
+        return deleted
+
+    def _freelist_count(self) -> int:
+        return self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def _reclaim_free_pages(self):
+        """Truncate the file until no free pages are left (lock held)."""
+        free = self._freelist_count()
+        while free:
+            # Pages are released as the pragma's result rows are read, so
+            # a bare execute() would only run the first step
+            self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+            remaining = self._freelist_count()
+            if remaining >= free:
+                # Files created before auto_vacuum was enabled can't be
+                # vacuumed incrementally; VACUUM rebuilds them with it on
+                self._conn.execute("VACUUM")
+                break
+            free = remaining
+
+    def page_count(self) -> int:
+        """Pages in the database file, free pages included."""
+        with self._lock:
+            return self._conn.execute("PRAGMA page_count").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
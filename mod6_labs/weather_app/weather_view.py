@@ -0,0 +1,187 @@
+# weather_view.py
+"""View models for the weather and forecast panels.
+
+Each view builds its control tree once. Rendering new data only assigns
+the properties that actually changed, so Flet sends a small diff instead
+of a whole new tree, and the caller issues a single ``page.update()``.
+"""
+
+from typing import List, Sequence
+
+import flet as ft
+
+from forecast_aggregation import ForecastBucket
+from models import CurrentWeather
+from theme import ACCENT, ERROR, MUTED_TEXT, SURFACE
+from units import speed_label, temperature_symbol
+
+ICON_URL = "https://openweathermap.org/img/wn/{code}{size}.png"
+
+
+def set_if_changed(control: ft.Control, name: str, value) -> bool:
+    """Assign control.<name> only when the value differs; True if it changed."""
+    if getattr(control, name) == value:
+        return False
+    setattr(control, name, value)
+    return True
+
+
+def create_info_card(icon, label, value=""):
+    """Create an info card for weather details."""
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Icon(icon, size=30, color=ACCENT),
+                ft.Text(label, size=12, color=MUTED_TEXT),
+                ft.Text(
+                    value,
+                    size=16,
+                    weight=ft.FontWeight.BOLD,
+                    color=ACCENT,
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=5,
+        ),
+        bgcolor=SURFACE,
+        border_radius=10,
+        padding=15,
+        width=150,
+    )
+
+
+class CurrentWeatherView:
+    """Current conditions panel."""
+
+    def __init__(self):
+        self.location = ft.Text("", size=24, weight=ft.FontWeight.BOLD)
+        self.icon = ft.Image(
+            src=ICON_URL.format(code="01d", size="@2x"),
+            width=100,
+            height=100,
+        )
+        self.description = ft.Text("", size=20, italic=True)
+        self.temperature = ft.Text(
+            "",
+            size=48,
+            weight=ft.FontWeight.BOLD,
+            color=ACCENT,
+        )
+        self.feels_like = ft.Text("", size=16, color=MUTED_TEXT)
+        self.humidity_card = create_info_card(ft.Icons.WATER_DROP, "Humidity")
+        self.wind_card = create_info_card(ft.Icons.AIR, "Wind Speed")
+        self.info_cards = [self.humidity_card, self.wind_card]
+
+        self.content = ft.Column(
+            [
+                self.location,
+                ft.Row(
+                    [self.icon, self.description],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                self.temperature,
+                self.feels_like,
+                ft.Divider(),
+                ft.Row(
+                    self.info_cards,
+                    alignment=ft.MainAxisAlignment.SPACE_EVENLY,
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=10,
+        )
+
+    @staticmethod
+    def _card_value(card: ft.Container) -> ft.Text:
+        return card.content.controls[2]
+
+    def render(self, data: CurrentWeather, units: str):
+        """Show data (already converted to units) in the existing controls."""
+        symbol = temperature_symbol(units)
+        set_if_changed(self.location, "value", f"{data.city_name}, {data.country}")
+        set_if_changed(self.icon, "src", ICON_URL.format(code=data.icon, size="@2x"))
+        set_if_changed(self.description, "value", data.description.title())
+        set_if_changed(self.temperature, "value", f"{data.temp:.1f}{symbol}")
+        set_if_changed(self.feels_like, "value", f"Feels like {data.feels_like:.1f}{symbol}")
+        set_if_changed(self._card_value(self.humidity_card), "value", f"{data.humidity}%")
+        set_if_changed(
+            self._card_value(self.wind_card),
+            "value",
+            f"{data.wind_speed:.1f} {speed_label(units)}",
+        )
+
+
+class ForecastView:
+    """Multi-day forecast panel with a fixed number of day cards."""
+
+    def __init__(self, days: int = 5):
+        self.cards: List[ft.Container] = [self._build_card() for _ in range(days)]
+        self.message = ft.Text("", color=ERROR, visible=False)
+        self.row = ft.Row(
+            self.cards,
+            alignment=ft.MainAxisAlignment.CENTER,
+            wrap=True,
+            spacing=10,
+        )
+        self.content = ft.Column(
+            [
+                ft.Text(
+                    f"{days}-Day Forecast",
+                    size=20,
+                    weight=ft.FontWeight.BOLD,
+                ),
+                self.message,
+                self.row,
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=10,
+        )
+
+    @staticmethod
+    def _build_card() -> ft.Container:
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text("", size=14, weight=ft.FontWeight.BOLD),
+                    ft.Image(
+                        src=ICON_URL.format(code="01d", size=""),
+                        width=50,
+                        height=50,
+                    ),
+                    ft.Text("", size=12, text_align=ft.TextAlign.CENTER),
+                    ft.Text("", size=12, weight=ft.FontWeight.BOLD),
+                ],
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=5,
+            ),
+            bgcolor=SURFACE,
+            border_radius=10,
+            padding=10,
+            width=120,
+        )
+
+    def render(self, days: Sequence[ForecastBucket]):
+        """Show one bucket per card (already converted); spare cards are hidden."""
+        set_if_changed(self.message, "visible", False)
+        set_if_changed(self.row, "visible", True)
+        for index, card in enumerate(self.cards):
+            if index >= len(days):
+                set_if_changed(card, "visible", False)
+                continue
+            day = days[index]
+            date, icon, description, high_low = card.content.controls
+            set_if_changed(card, "visible", True)
+            set_if_changed(date, "value", day.label)
+            set_if_changed(icon, "src", ICON_URL.format(code=day.icon, size=""))
+            set_if_changed(description, "value", day.description.title())
+            set_if_changed(
+                high_low,
+                "value",
+                f"H: {day.temp_max:.0f}° L: {day.temp_min:.0f}°",
+            )
+
+    def render_error(self, message: str):
+        """Replace the cards with an error message."""
+        set_if_changed(self.message, "value", message)
+        set_if_changed(self.message, "visible", True)
+        set_if_changed(self.row, "visible", False)
@@ -1,74 +1,199 @@
+import threading
+
 import flet as ft
-from database import update_contact_db, delete_contact_db, add_contact_db, get_all_contacts_db
+from database import (
+    PAGE_SIZE,
+    update_contact_db,
+    delete_contact_db,
+    add_contact_db,
+    contact_matches_db,
+    get_all_contacts_db,
+    get_contacts_page_db,
+)
+
+# Load the next page when the list is scrolled this close to its end (pixels)
+LOAD_MORE_THRESHOLD = 300
 
 
 def display_contacts(page, contacts_list_view, db_conn, search_term=""):
-    """Fetches and displays all contacts in the ListView with filter if search term is provided."""
-    contacts_list_view.controls.clear()
-    contacts = get_all_contacts_db(db_conn, search_term)
-
-    for contact in contacts:
-        contact_id, name, phone, email = contact
-
-        contact_card = ft.Card(
-            elevation=3,
-            margin=5,
-            content=ft.Container(
-                padding=15,
-                content=ft.Column(
-                    spacing=8,
-                    controls=[
-                        ft.Row(
-                            [
-                                ft.Text(name, size=18, weight=ft.FontWeight.BOLD, expand=True),
-                                ft.PopupMenuButton(
-                                    icon=ft.Icons.MORE_VERT,
-                                    items=[
-                                        ft.PopupMenuItem(
-                                            text="Edit",
-                                            icon=ft.Icons.EDIT,
-                                            on_click=lambda _, c=contact: open_edit_dialog(
-                                                page, c, db_conn, contacts_list_view
-                                            ),
+    """Displays the first page of contacts in the ListView, or the matches if a search term is provided."""
+    reset_contacts_view(contacts_list_view, search_term)
+    load_more_contacts(page, contacts_list_view, db_conn)
+
+
+def display_search_results(page, contacts_list_view, db_conn, search_term, contacts):
+    """Displays contacts already found for a search term in the ListView."""
+    # Runs on a search worker thread, so it changes the list only under its lock
+    with list_lock(contacts_list_view):
+        reset_contacts_view(contacts_list_view, search_term)
+        contacts_list_view.data["done"] = True
+        for contact in contacts:
+            append_contact_card(page, contact, db_conn, contacts_list_view)
+        page.update(contacts_list_view)
+
+
+def list_lock(contacts_list_view):
+    """Returns the lock guarding the ListView's controls and paging state."""
+    state = contacts_list_view.data
+    return state["lock"] if state else threading.RLock()
+
+
+def reset_contacts_view(contacts_list_view, search_term=""):
+    """Empties the ListView and its paging state."""
+    # Scroll events, searches and the add/edit/delete handlers arrive on
+    # several threads at once; the lock is kept across resets so they all
+    # serialize on the same one
+    lock = list_lock(contacts_list_view)
+    with lock:
+        contacts_list_view.controls.clear()
+        # Paging state and the id -> card index live on the ListView so the
+        # scroll handler and the add/edit/delete handlers can pick them up
+        contacts_list_view.data = {
+            "search_term": search_term,
+            "last_id": 0,
+            "done": False,
+            "loading": False,
+            # Set when a contact is added, edited or deleted while a page is read
+            "changed": False,
+            "cards": {},
+            "lock": lock,
+        }
+
+
+def load_more_contacts(page, contacts_list_view, db_conn):
+    """Appends the next page of contacts to the ListView."""
+    state = contacts_list_view.data
+    if not state:
+        return
+    with state["lock"]:
+        if state["done"] or state["loading"]:
+            return
+        state["loading"] = True
+        after_id = state["last_id"]
+
+    try:
+        if state["search_term"]:
+            # Searches already return only the top matches
+            contacts = get_all_contacts_db(db_conn, state["search_term"])
+        else:
+            contacts = get_contacts_page_db(db_conn, after_id)
+    except Exception:
+        with state["lock"]:
+            state["loading"] = False
+        raise
+
+    with state["lock"]:
+        state["loading"] = False
+        # Drop the page if the list was reset or moved on while it was read
+        if contacts_list_view.data is not state or state["last_id"] != after_id:
+            return
+        # A contact changed during the read may be missing or outdated in it
+        reread = state["changed"]
+        state["changed"] = False
+        if not reread:
+            if state["search_term"]:
+                state["done"] = True
+            else:
+                state["done"] = len(contacts) < PAGE_SIZE
+                if contacts:
+                    state["last_id"] = contacts[-1][0]
+            for contact in contacts:
+                append_contact_card(page, contact, db_conn, contacts_list_view)
+
+    if reread:
+        load_more_contacts(page, contacts_list_view, db_conn)
+        return
+    page.update(contacts_list_view)
+
+
+def append_contact_card(page, contact, db_conn, contacts_list_view):
+    """Adds a card for a contact to the end of the ListView and to the card index."""
+    card = build_contact_card(page, contact, db_conn, contacts_list_view)
+    contacts_list_view.controls.append(card)
+    contacts_list_view.data["cards"][contact[0]] = card
+
+
+def load_more_on_scroll(e, page, contacts_list_view, db_conn):
+    """Loads the next page once the ListView is scrolled near its end."""
+    if e.max_scroll_extent is None or e.pixels is None:
+        return
+    if e.pixels >= e.max_scroll_extent - LOAD_MORE_THRESHOLD:
+        load_more_contacts(page, contacts_list_view, db_conn)
+
+
+def build_contact_card(page, contact, db_conn, contacts_list_view):
+    """Builds the card shown for one contact."""
+    contact_id, name, phone, email = contact
+    name_text = ft.Text(name, size=18, weight=ft.FontWeight.BOLD, expand=True)
+    phone_text = ft.Text(phone if phone else "No phone", size=14)
+    email_text = ft.Text(email if email else "No email", size=14)
+
+    card = ft.Card(
+        elevation=3,
+        margin=5,
+        content=ft.Container(
+            padding=15,
+            content=ft.Column(
+                spacing=8,
+                controls=[
+                    ft.Row(
+                        [
+                            name_text,
+                            ft.PopupMenuButton(
+                                icon=ft.Icons.MORE_VERT,
+                                items=[
+                                    ft.PopupMenuItem(
+                                        text="Edit",
+                                        icon=ft.Icons.EDIT,
+                                        on_click=lambda _: open_edit_dialog(
+                                            page, card.data["contact"], db_conn, contacts_list_view
                                         ),
-                                        ft.PopupMenuItem(),
-                                        ft.PopupMenuItem(
-                                            text="Delete",
-                                            icon=ft.Icons.DELETE,
-                                            on_click=lambda _, cid=contact_id: delete_contact(
-                                                page, cid, db_conn, contacts_list_view
-                                            ),
+                                    ),
+                                    ft.PopupMenuItem(),
+                                    ft.PopupMenuItem(
+                                        text="Delete",
+                                        icon=ft.Icons.DELETE,
+                                        on_click=lambda _, cid=contact_id: delete_contact(
+                                            page, cid, db_conn, contacts_list_view
                                         ),
-                                    ],
-                                ),
-                            ],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                        ),
-                        ft.Divider(),
-                        ft.Row(
-                            [
-                                ft.Icon(ft.Icons.PHONE, color=ft.Colors.BLUE),
-                                ft.Text(phone if phone else "No phone", size=14),
-                            ]
-                        ),
-                        ft.Row(
-                            [
-                                ft.Icon(ft.Icons.EMAIL, color=ft.Colors.GREEN),
-                                ft.Text(email if email else "No email", size=14),
-                            ]
-                        ),
-                    ],
-                ),
+                                    ),
+                                ],
+                            ),
+                        ],
+                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                    ),
+                    ft.Divider(),
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.PHONE, color=ft.Colors.BLUE),
+                            phone_text,
+                        ]
+                    ),
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.EMAIL, color=ft.Colors.GREEN),
+                            email_text,
+                        ]
+                    ),
+                ],
             ),
-        )
+        ),
+        data={"contact": contact, "name": name_text, "phone": phone_text, "email": email_text},
+    )
+    return card
 
-        contacts_list_view.controls.append(contact_card)
 
-    page.update()
+def patch_contact_card(card, contact):
+    """Shows a contact's new details on its existing card."""
+    contact_id, name, phone, email = contact
+    card.data["contact"] = contact
+    card.data["name"].value = name
+    card.data["phone"].value = phone if phone else "No phone"
+    card.data["email"].value = email if email else "No email"
 
 
 def add_contact(page, inputs, contacts_list_view, db_conn):
-    """Adds a new contact and refreshes the list."""
+    """Adds a new contact and shows its card."""
     name_input, phone_input, email_input = inputs
 
     if not name_input.value.strip():
@@ -78,22 +203,41 @@ def add_contact(page, inputs, contacts_list_view, db_conn):
     else:
         name_input.error_text = None
 
-    add_contact_db(db_conn, name_input.value, phone_input.value, email_input.value)
+    contact = add_contact_db(db_conn, name_input.value, phone_input.value, email_input.value)
 
     for field in inputs:
         field.value = ""
 
-    display_contacts(page, contacts_list_view, db_conn)
-    page.update()
+    # The list is in id order, so the new contact belongs at the end: show it
+    # now if every page is loaded, otherwise the next page will bring it in.
+    # Under the lock, so a page load can't read last_id or append in between.
+    state = contacts_list_view.data
+    with state["lock"]:
+        if state["loading"]:
+            # The page being read may have missed it; it is read again
+            state["changed"] = True
+        elif state["search_term"]:
+            if contact_matches_db(db_conn, contact[0], state["search_term"]):
+                append_contact_card(page, contact, db_conn, contacts_list_view)
+        elif state["done"]:
+            append_contact_card(page, contact, db_conn, contacts_list_view)
+            state["last_id"] = contact[0]
+
+    page.update(contacts_list_view, *inputs)
 
 
 def delete_contact(page, contact_id, db_conn, contacts_list_view):
-    """Ask for confirmation before deleting a contact and refreshes the list."""
+    """Ask for confirmation before deleting a contact and removes its card."""
     def on_yes_click(e):
         delete_contact_db(db_conn, contact_id)
-        page.close(confirm_dialog)
-        display_contacts(page, contacts_list_view, db_conn)
-        page.update()
+        confirm_dialog.open = False
+        state = contacts_list_view.data
+        with state["lock"]:
+            state["changed"] |= state["loading"]
+            card = state["cards"].pop(contact_id, None)
+            if card is not None:
+                contacts_list_view.controls.remove(card)
+        page.update(confirm_dialog, contacts_list_view)
     
     def on_no_click(e):
         page.close(confirm_dialog)
@@ -129,10 +273,18 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view):
     edit_email = ft.TextField(label="Email", value=email)
 
     def save_and_close(e):
-        update_contact_db(db_conn, contact_id, edit_name.value, edit_phone.value, edit_email.value)
+        updated = update_contact_db(db_conn, contact_id, edit_name.value, edit_phone.value, edit_email.value)
         dialog.open = False
-        page.update()
-        display_contacts(page, contacts_list_view, db_conn)
+        state = contacts_list_view.data
+        with state["lock"]:
+            state["changed"] |= state["loading"]
+            card = state["cards"].get(contact_id)
+            if updated is not None and card is not None:
+                patch_contact_card(card, updated)
+        if updated is not None and card is not None:
+            page.update(dialog, card)
+        else:
+            page.update(dialog)
 
     dialog = ft.AlertDialog(
         modal=True,
@@ -1,50 +1,302 @@
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 
-def init_db():
+DB_PATH = 'contacts.db'
+
+# Read-only connections shared by searches and page loads
+READER_POOL_SIZE = 4
+
+# Prepared statements each connection keeps for reuse (sqlite3's default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Page cache per connection (KiB) and memory-mapped I/O size (bytes)
+CACHE_SIZE_KIB = 8 * 1024
+MMAP_SIZE = 64 * 1024 * 1024
+
+# Seconds to wait for a lock held by another connection
+BUSY_TIMEOUT = 5.0
+
+# Contacts loaded per page of the contact list
+PAGE_SIZE = 50
+
+# Most matches returned by a search
+SEARCH_LIMIT = 50
+
+# Column weights for bm25 ranking: name matches count most
+RANK_WEIGHTS = (10.0, 2.0, 1.0)  # name, phone, email
+
+# How the search index splits and folds words: case and accents are ignored,
+# anything but letters and digits (including "_") separates words
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+class ConnectionPool:
+    """One writer connection plus a pool of read-only connections to the database.
+
+    The database runs in WAL mode, so readers see the last committed data
+    and never wait for the writer. Writes are serialized on the writer's
+    lock and committed (or rolled back) once per ``write()`` block.
+    Connections are used by one thread at a time; the Flet event handlers
+    and search worker threads borrow them through ``read()`` and ``write()``.
+    """
+
+    def __init__(self, path=DB_PATH, readers=READER_POOL_SIZE):
+        self.path = path
+        # Every connection opened, idle or borrowed, so close() reaches them all
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._write_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(readers)
+
+    def _connect(self, read_only=False):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def read(self):
+        """Borrows a read-only connection, opening one if none is free."""
+        self._reader_slots.acquire()
+        try:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect(read_only=True)
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+        finally:
+            self._reader_slots.release()
+
+    @contextmanager
+    def write(self):
+        """Borrows the writer connection for one transaction."""
+        with self._write_lock:
+            # sqlite3 only opens a transaction by itself before DML, so
+            # begin explicitly to cover DDL too (and take the write lock early)
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.rollback()
+                raise
+            self._writer.commit()
+
+    @property
+    def total_changes(self):
+        """Rows changed through this pool since it was opened."""
+        return self._writer.total_changes
+
+    def close(self):
+        """Closes every connection, including readers still borrowed."""
+        with self._write_lock, self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def init_db(path=DB_PATH):
     """Initializes the database and creates the contacts table if it doesn't exist."""
-    conn = sqlite3.connect('contacts.db', check_same_thread=False)
+    db = ConnectionPool(path)
+    with db.write() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT
+            )
+            ''')
+        init_search_index(conn)
+    return db
+
+def init_search_index(conn):
+    """Creates the FTS5 search index over contacts and the triggers that keep it in sync."""
     cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS contacts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        phone TEXT,
-        email TEXT
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'"
+    ).fetchone()
+    # External content table: the index stores no second copy of the rows.
+    # Prefix indexes make short prefix queries ("jo*") index lookups.
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        name, phone, email,
+        content='contacts',
+        content_rowid='id',
+        tokenize='{TOKENIZER}',
+        prefix='1 2 3'
         )
         ''')
-    conn.commit()
-    return conn
+    # One execute() per trigger: executescript() would COMMIT first and take
+    # the DDL out of the caller's write() transaction
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts (rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+            VALUES ('delete', old.id, old.name, old.phone, old.email);
+        END
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, name, phone, email)
+            VALUES ('delete', old.id, old.name, old.phone, old.email);
+            INSERT INTO contacts_fts (rowid, name, phone, email)
+            VALUES (new.id, new.name, new.phone, new.email);
+        END
+        ''')
+    if not exists:
+        # Index contacts saved before the search index existed
+        cursor.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
 
-def add_contact_db(conn, name, phone, email):
-    """Adds a new contact to the database."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)",
-        (name, phone, email)
-    )
-    conn.commit()
-def get_all_contacts_db(conn, search_term=""):
-    """Retrieves all contacts from the database."""
-    cursor = conn.cursor()
-    if search_term:
+# Built once so the statement cache can reuse the prepared query
+SEARCH_SQL = f'''
+    SELECT c.id, c.name, c.phone, c.email
+    FROM contacts_fts
+    JOIN contacts AS c ON c.id = contacts_fts.rowid
+    WHERE contacts_fts MATCH ?
+    ORDER BY bm25(contacts_fts, {", ".join(map(str, RANK_WEIGHTS))})
+    LIMIT ?
+    '''
+
+
+class Tokenizer:
+    """Splits text into words exactly as the search index does.
+
+    Python's own case folding and word splitting disagree with SQLite's
+    tokenizer (on "_", "ß", Hangul, combining marks, ...), so the text is
+    run through the same tokenizer on a private in-memory FTS5 table. The
+    rows are only ever inserted in a transaction that is rolled back.
+    """
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"CREATE VIRTUAL TABLE words USING fts5(text, tokenize='{TOKENIZER}')")
+        self._conn.execute("CREATE VIRTUAL TABLE words_vocab USING fts5vocab(words, 'instance')")
+        self._lock = threading.Lock()
+
+    def split_many(self, texts):
+        """Returns the words of each text (None counts as empty), in order."""
+        texts = list(texts)
+        words = [[] for _ in texts]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO words (rowid, text) VALUES (?, ?)", enumerate(texts)
+                )
+                for row, word in self._conn.execute(
+                    "SELECT doc, term FROM words_vocab ORDER BY doc, offset"
+                ):
+                    words[row].append(word)
+            finally:
+                self._conn.execute("ROLLBACK")
+        return words
+
+    def split(self, text):
+        """Returns the words of one text."""
+        return self.split_many([text])[0]
+
+
+# Shared by search queries and the in-memory search refinement
+tokenizer = Tokenizer()
+
+def build_match_query(search_term):
+    """Turns user input into an FTS5 query matching every word as a prefix."""
+    words = tokenizer.split(search_term)
+    return " ".join(f'"{word}"*' for word in words)
+
+def add_contact_db(db, name, phone, email):
+    """Adds a new contact to the database and returns its row."""
+    with db.write() as conn:
+        cursor = conn.cursor()
         cursor.execute(
-            "SELECT id, name, phone, email FROM contacts WHERE name LIKE ?",
-            (f"%{search_term}%",),
+            "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?) RETURNING id, name, phone, email",
+            (name, phone, email)
         )
-    else:
+        return cursor.fetchone()
+
+def search_contacts_db(db, search_term, limit=SEARCH_LIMIT):
+    """Returns the best limit contacts whose name, phone or email words start with the search words."""
+    query = build_match_query(search_term)
+    if not query:
+        return []
+    with db.read() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SEARCH_SQL, (query, limit))
+        return cursor.fetchall()
+
+def get_all_contacts_db(db, search_term=""):
+    """Retrieves all contacts from the database, or the top matches for a search term."""
+    if search_term:
+        return search_contacts_db(db, search_term)
+    with db.read() as conn:
+        cursor = conn.cursor()
         cursor.execute("SELECT id, name, phone, email FROM contacts")
-    return cursor.fetchall()
+        return cursor.fetchall()
 
-def update_contact_db(conn, contact_id, name, phone, email):
-    """Updates an existing contact in the database."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE contacts SET name = ?, phone = ?, email = ? WHERE id = ?",
-        (name, phone, email, contact_id)
-    )
-    conn.commit()
-def delete_contact_db(conn, contact_id):
-    """Deletes a contact from the database."""
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-    conn.commit()
+def get_contacts_page_db(db, after_id=0, limit=PAGE_SIZE):
+    """Retrieves the next limit contacts with an id above after_id, in id order."""
+    # Keyset pagination: seeks straight to after_id on the primary key,
+    # so every page costs the same however far down the list it is.
+    with db.read() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, name, phone, email FROM contacts WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+        return cursor.fetchall()
+
+def contact_matches_db(db, contact_id, search_term):
+    """Checks whether one contact matches a search term."""
+    query = build_match_query(search_term)
+    if not query:
+        return False
+    with db.read() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM contacts_fts WHERE contacts_fts MATCH ? AND rowid = ?",
+            (query, contact_id)
+        )
+        # fetchall() finishes the statement so the reader holds no snapshot
+        return bool(cursor.fetchall())
+
+def update_contact_db(db, contact_id, name, phone, email):
+    """Updates an existing contact in the database and returns its new row, or None if it doesn't exist."""
+    with db.write() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE contacts SET name = ?, phone = ?, email = ? WHERE id = ? RETURNING id, name, phone, email",
+            (name, phone, email, contact_id)
+        )
+        return cursor.fetchone()
+
+def delete_contact_db(db, contact_id):
+    """Deletes a contact from the database and returns whether it existed."""
+    with db.write() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+        return cursor.rowcount > 0
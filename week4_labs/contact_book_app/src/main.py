@@ -1,6 +1,8 @@
 import flet as ft
 from database import init_db
-from app_logic import display_contacts, add_contact
+from app_logic import display_contacts, display_search_results, add_contact, load_more_on_scroll
+from search import ContactSearch
+from theme import MUTED_TEXT, apply_theme, is_dark, toggle_theme_mode
 
 def main(page: ft.Page):
     page.title = "Contact Book"
@@ -11,18 +13,12 @@ def main(page: ft.Page):
     db_conn = init_db()
 
     def theme_changed(e):
-        page.theme_mode = (
-            ft.ThemeMode.LIGHT
-            if page.theme_mode == ft.ThemeMode.DARK
-            else ft.ThemeMode.DARK
-        )
-        theme_switch.label = (
-            "Dark theme" if page.theme_mode == ft.ThemeMode.LIGHT else "Light theme"
-        )
+        dark = toggle_theme_mode(page)
+        theme_switch.label = "Light theme" if dark else "Dark theme"
         page.update()
 
-    page.theme_mode = ft.ThemeMode.LIGHT
-    theme_switch = ft.Switch(label="Dark theme", on_change=theme_changed)
+    apply_theme(page, seed=ft.Colors.BLUE, mode=ft.ThemeMode.LIGHT)
+    theme_switch = ft.Switch(label="Dark theme", value=is_dark(page), on_change=theme_changed)
 
 
     name_input = ft.TextField(label="Name", expand=True)
@@ -31,19 +27,38 @@ def main(page: ft.Page):
 
     inputs = (name_input, phone_input, email_input)
 
+    def search_changed(e):
+        if e.control.value.strip():
+            contact_search.submit(e.control.value)
+        else:
+            contact_search.cancel()
+            display_contacts(page, contacts_list_view, db_conn)
+
+    contact_search = ContactSearch(
+        db_conn,
+        on_results=lambda term, contacts: display_search_results(
+            page, contacts_list_view, db_conn, term, contacts
+        ),
+    )
+
     search_field = ft.TextField(
         hint_text="Search contacts...",
         prefix_icon=ft.Icons.SEARCH,
-        on_change=lambda e: display_contacts(page, contacts_list_view, db_conn, e.control.value),
+        on_change=search_changed,
         expand=True,
     )
 
-    contacts_list_view = ft.ListView(expand=1, spacing=10)
+    contacts_list_view = ft.ListView(
+        expand=1,
+        spacing=10,
+        on_scroll_interval=100,
+        on_scroll=lambda e: load_more_on_scroll(e, page, contacts_list_view, db_conn),
+    )
     
     add_button = ft.ElevatedButton(
         text="Add Contact",
         icon=ft.Icons.ADD,
-        color=ft.Colors.GREY_700,
+        color=MUTED_TEXT,
         style=ft.ButtonStyle(
             shape=ft.RoundedRectangleBorder(radius=20),
             padding=ft.padding.symmetric(horizontal=30, vertical=5),
@@ -0,0 +1,134 @@
+# search.py
+"""Debounced contact search that runs off the event handler thread.
+
+Each keystroke restarts a short timer; only the text that is still in the
+search field when the timer fires is queried, on the timer's worker
+thread. Every submit bumps a generation number, so a query overtaken by
+newer input is dropped instead of rendered (it is never interrupted; FTS
+queries are bounded by ``SEARCH_LIMIT`` and finish quickly). Results are
+rendered under the same lock as the generation check, so once ``submit()``
+or ``cancel()`` returns no older search can still replace the list.
+
+Results are cached per search term. When the new term extends a cached
+one ("jo" -> "joh") and that earlier result was complete (fewer than
+``SEARCH_LIMIT`` rows), the new results are filtered from it in memory,
+splitting words with the index's own tokenizer so the filter matches
+exactly what the FTS query would. The cache is dropped whenever the
+connection has written anything since it was filled.
+"""
+
+import threading
+
+from database import SEARCH_LIMIT, search_contacts_db, tokenizer
+
+# Seconds to wait after the last keystroke before searching
+SEARCH_DEBOUNCE = 0.2
+
+# Search terms whose results are kept
+CACHE_SIZE = 64
+
+
+def words(text):
+    """Splits text into lowercased, accent-free words, as the FTS index does."""
+    return tokenizer.split(text)
+
+
+def filter_contacts(contacts, search_words):
+    """Contacts where every search word starts a word of the name, phone or email."""
+    fields = tokenizer.split_many(field for contact in contacts for field in contact[1:])
+    matches = []
+    for i, contact in enumerate(contacts):
+        contact_words = [word for field in fields[3 * i:3 * i + 3] for word in field]
+        if all(
+            any(word.startswith(search_word) for word in contact_words)
+            for search_word in search_words
+        ):
+            matches.append(contact)
+    return matches
+
+
+class ContactSearch:
+    """Runs searches for the latest text typed and hands the results to on_results(term, contacts)."""
+
+    def __init__(self, db_conn, on_results, delay=SEARCH_DEBOUNCE):
+        self.db_conn = db_conn
+        self.on_results = on_results
+        self.delay = delay
+        self._lock = threading.Lock()  # guards the timer and generation
+        self._timer = None
+        self._generation = 0
+        # Timer threads can overlap, so the cache has its own lock
+        self._cache_lock = threading.Lock()
+        self._cache = {}  # normalized term -> (contacts, complete)
+        self._cache_changes = db_conn.total_changes
+
+    def submit(self, search_term):
+        """Searches for search_term once no newer input arrives within the debounce delay."""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run, (search_term, self._generation))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """Drops any pending or running search, waiting for a render in progress."""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _is_current(self, generation):
+        return generation == self._generation
+
+    def _run(self, search_term, generation):
+        if not self._is_current(generation):
+            return
+        contacts = self.search(search_term)
+        # Checked and rendered in one step: a cancel() between the two would
+        # let these results overwrite the list it restored
+        with self._lock:
+            if self._is_current(generation):
+                self.on_results(search_term, contacts)
+
+    def search(self, search_term):
+        """Returns the top matches for search_term, from the cache when possible."""
+        key = " ".join(words(search_term))
+        if not key:
+            return []
+        with self._cache_lock:
+            changes = self.db_conn.total_changes
+            if changes != self._cache_changes:
+                # Contacts were added, edited or deleted since the cache was filled
+                self._cache.clear()
+                self._cache_changes = changes
+
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached[0]
+            base = self._narrowest_complete(key)
+
+        if base is not None:
+            contacts = filter_contacts(base, key.split())
+            complete = True
+        else:
+            contacts = search_contacts_db(self.db_conn, search_term)
+            complete = len(contacts) < SEARCH_LIMIT
+
+        with self._cache_lock:
+            # Results read before a write would be stale, so don't keep them
+            if self.db_conn.total_changes == changes == self._cache_changes:
+                if len(self._cache) >= CACHE_SIZE:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[key] = (contacts, complete)
+        return contacts
+
+    def _narrowest_complete(self, key):
+        """Longest cached term that key extends and whose results are complete (cache lock held)."""
+        best = None
+        for term, (contacts, complete) in self._cache.items():
+            if complete and key.startswith(term) and (best is None or len(term) > len(best[0])):
+                best = (term, contacts)
+        return best[1] if best else None
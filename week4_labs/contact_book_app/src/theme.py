@@ -0,0 +1,55 @@
+# theme.py
+"""Theme setup and switching based on color scheme roles.
+
+Controls use Material color-scheme roles (``ft.Colors.SURFACE``,
+``ft.Colors.PRIMARY``, ...) instead of fixed colors. Flutter resolves the
+roles against the light or dark scheme, so switching themes is a single
+``page.theme_mode`` change with no per-control recoloring.
+
+Vendored copy: mod6_labs/weather_app/theme.py holds the same code (only
+this paragraph differs). Each app is packaged on its own, so they can't
+import one shared module; make every change in both files.
+mod6_labs/weather_app/test_theme.py fails when the copies drift apart.
+"""
+
+import flet as ft
+
+# Color roles shared by the apps
+SURFACE = ft.Colors.SURFACE
+PANEL = ft.Colors.SURFACE_CONTAINER_HIGHEST
+ACCENT = ft.Colors.PRIMARY
+MUTED_TEXT = ft.Colors.ON_SURFACE_VARIANT
+BORDER = ft.Colors.OUTLINE
+DIVIDER = ft.Colors.OUTLINE_VARIANT
+ERROR = ft.Colors.ERROR
+
+
+def tint(color: str, opacity: float = 0.25) -> str:
+    """Translucent color that reads well over both light and dark surfaces."""
+    return ft.Colors.with_opacity(opacity, color)
+
+
+def apply_theme(page: ft.Page, seed: str = ft.Colors.BLUE, mode=ft.ThemeMode.SYSTEM):
+    """Give the page matching light and dark schemes generated from seed."""
+    page.theme = ft.Theme(color_scheme_seed=seed)
+    page.dark_theme = ft.Theme(color_scheme_seed=seed)
+    page.theme_mode = mode
+
+
+def is_dark(page: ft.Page) -> bool:
+    """Whether the page currently renders dark (resolving SYSTEM mode)."""
+    if page.theme_mode == ft.ThemeMode.SYSTEM:
+        return page.platform_brightness == ft.Brightness.DARK
+    return page.theme_mode == ft.ThemeMode.DARK
+
+
+def toggle_theme_mode(page: ft.Page) -> bool:
+    """
+    Switch the page between light and dark mode.
+
+    Returns:
+        True if the page is now dark
+    """
+    dark = not is_dark(page)
+    page.theme_mode = ft.ThemeMode.DARK if dark else ft.ThemeMode.LIGHT
+    return dark
@@ -0,0 +1,28 @@
+# conftest.py
+"""Shared pytest fixtures: a contact database in a temporary directory."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app modules import each other by name, as flet runs them from src/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from database import add_contact_db, init_db  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh, empty database (never the app's own contacts.db)."""
+    pool = init_db(str(tmp_path / "contacts.db"))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def add(db):
+    """Adds a contact and returns its id."""
+    def add(name, phone="", email=""):
+        return add_contact_db(db, name, phone, email)[0]
+    return add
@@ -0,0 +1,227 @@
+# test_app_logic.py
+"""Tests for the contact list view: paging and the card index."""
+
+import threading
+
+import flet as ft
+import pytest
+
+import app_logic
+from app_logic import (
+    add_contact,
+    delete_contact,
+    display_contacts,
+    load_more_contacts,
+    open_edit_dialog,
+)
+from database import PAGE_SIZE
+
+
+class FakePage:
+    """Records updates instead of sending them to a Flet client."""
+
+    def __init__(self):
+        self.updates = []
+        self.dialogs = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+    def open(self, dialog):
+        self.dialogs.append(dialog)
+
+    def close(self, dialog):
+        dialog.open = False
+
+
+@pytest.fixture
+def page():
+    return FakePage()
+
+
+@pytest.fixture
+def list_view():
+    return ft.ListView()
+
+
+def shown_ids(list_view):
+    return [card.data["contact"][0] for card in list_view.controls]
+
+
+@pytest.mark.parametrize("count", [PAGE_SIZE * 2, PAGE_SIZE * 2 + 7])
+def test_pages_load_until_done(page, list_view, db, add, count):
+    ids = [add(f"Contact {i}") for i in range(count)]
+    display_contacts(page, list_view, db)
+    assert shown_ids(list_view) == ids[:PAGE_SIZE]
+
+    while not list_view.data["done"]:
+        load_more_contacts(page, list_view, db)
+    assert shown_ids(list_view) == ids
+    assert list(list_view.data["cards"]) == ids
+
+    # Nothing left to load
+    updates = len(page.updates)
+    load_more_contacts(page, list_view, db)
+    assert len(page.updates) == updates
+
+
+def test_search_shows_only_matches(page, list_view, db, add):
+    ada = add("Ada Lovelace")
+    add("Grace Hopper")
+    display_contacts(page, list_view, db, "ada")
+    assert shown_ids(list_view) == [ada]
+    assert list_view.data["done"]
+
+
+def test_concurrent_scroll_events_load_a_page_once(page, list_view, db, add, monkeypatch):
+    """Only the first of several overlapping load-more calls queries the database."""
+    ids = [add(f"Contact {i}") for i in range(PAGE_SIZE * 2)]
+    display_contacts(page, list_view, db)
+
+    reading = threading.Event()
+    release = threading.Event()
+    queries = []
+    get_page = app_logic.get_contacts_page_db
+
+    def slow_page(db_conn, after_id=0, limit=PAGE_SIZE):
+        queries.append(after_id)
+        reading.set()
+        release.wait(5)
+        return get_page(db_conn, after_id, limit)
+
+    monkeypatch.setattr(app_logic, "get_contacts_page_db", slow_page)
+    first = threading.Thread(target=load_more_contacts, args=(page, list_view, db))
+    first.start()
+    assert reading.wait(5)
+    others = [
+        threading.Thread(target=load_more_contacts, args=(page, list_view, db))
+        for _ in range(4)
+    ]
+    for thread in others:
+        thread.start()
+    for thread in others:
+        thread.join(5)
+    release.set()
+    first.join(5)
+
+    assert queries == [ids[PAGE_SIZE - 1]]
+    assert shown_ids(list_view) == ids
+
+
+def test_page_read_across_a_reset_is_dropped(page, list_view, db, add, monkeypatch):
+    """A page that arrives after the list was reset (e.g. by a search) isn't appended."""
+    ada = add("Ada Lovelace")
+    add("Grace Hopper")
+    get_page = app_logic.get_contacts_page_db
+
+    def page_then_search(db_conn, after_id=0, limit=PAGE_SIZE):
+        contacts = get_page(db_conn, after_id, limit)
+        monkeypatch.setattr(app_logic, "get_contacts_page_db", get_page)
+        display_contacts(page, list_view, db, "ada")
+        return contacts
+
+    app_logic.reset_contacts_view(list_view)
+    monkeypatch.setattr(app_logic, "get_contacts_page_db", page_then_search)
+    load_more_contacts(page, list_view, db)
+    assert shown_ids(list_view) == [ada]
+
+
+def new_contact_inputs(name, phone="", email=""):
+    return [ft.TextField(value=name), ft.TextField(value=phone), ft.TextField(value=email)]
+
+
+def test_added_contact_is_shown_once_every_page_is_loaded(page, list_view, db, add):
+    add("Ada Lovelace")
+    display_contacts(page, list_view, db)
+    inputs = new_contact_inputs("Grace Hopper")
+    add_contact(page, inputs, list_view, db)
+
+    grace = list_view.data["last_id"]
+    assert shown_ids(list_view) == [1, grace]
+    assert list_view.data["cards"][grace].data["contact"][1] == "Grace Hopper"
+    assert [field.value for field in inputs] == ["", "", ""]
+
+
+def test_added_contact_waits_for_its_page(page, list_view, db, add):
+    """While pages are left to load, the new contact arrives with the last one."""
+    ids = [add(f"Contact {i}") for i in range(PAGE_SIZE + 1)]
+    display_contacts(page, list_view, db)
+    add_contact(page, new_contact_inputs("Grace Hopper"), list_view, db)
+    assert shown_ids(list_view) == ids[:PAGE_SIZE]
+
+    load_more_contacts(page, list_view, db)
+    assert shown_ids(list_view) == ids + [ids[-1] + 1]
+
+
+def test_added_contact_is_shown_in_matching_search(page, list_view, db, add):
+    add("Ada Lovelace")
+    display_contacts(page, list_view, db, "grace")
+    add_contact(page, new_contact_inputs("Ada Byron"), list_view, db)
+    assert shown_ids(list_view) == []
+    add_contact(page, new_contact_inputs("Grace Hopper"), list_view, db)
+    assert [c.data["contact"][1] for c in list_view.controls] == ["Grace Hopper"]
+
+
+def test_contact_added_during_a_page_read_is_not_lost(page, list_view, db, add, monkeypatch):
+    """A page read before an add committed is read again instead of ending the list."""
+    ada = add("Ada Lovelace")
+    get_page = app_logic.get_contacts_page_db
+    reads = []
+
+    def add_during_read(db_conn, after_id=0, limit=PAGE_SIZE):
+        contacts = get_page(db_conn, after_id, limit)
+        reads.append(after_id)
+        if len(reads) == 1:
+            add_contact(page, new_contact_inputs("Grace Hopper"), list_view, db)
+        return contacts
+
+    monkeypatch.setattr(app_logic, "get_contacts_page_db", add_during_read)
+    display_contacts(page, list_view, db)
+    assert reads == [0, 0]
+    assert shown_ids(list_view) == [ada, ada + 1]
+    assert list_view.data["done"]
+
+
+def test_edit_patches_the_card(page, list_view, db, add):
+    ada = add("Ada Lovelace", "555-0100")
+    display_contacts(page, list_view, db)
+    card = list_view.data["cards"][ada]
+
+    open_edit_dialog(page, card.data["contact"], db, list_view)
+    dialog = page.dialogs[-1]
+    name, phone, email = dialog.content.content.controls
+    name.value = "Ada King"
+    phone.value = ""
+    dialog.actions[1].on_click(None)
+
+    assert list_view.controls == [card]
+    assert card.data["contact"] == (ada, "Ada King", "", "")
+    assert (card.data["name"].value, card.data["phone"].value) == ("Ada King", "No phone")
+    assert page.updates[-1] == (dialog, card)
+
+
+def test_delete_removes_the_card(page, list_view, db, add):
+    ada = add("Ada Lovelace")
+    grace = add("Grace Hopper")
+    display_contacts(page, list_view, db)
+
+    delete_contact(page, ada, db, list_view)
+    dialog = page.dialogs[-1]
+    dialog.actions[1].on_click(None)
+
+    assert shown_ids(list_view) == [grace]
+    assert list(list_view.data["cards"]) == [grace]
+    assert not dialog.open
+
+
+def test_search_results_replace_the_list_under_the_same_lock(page, list_view, db, add):
+    ada = add("Ada Lovelace")
+    add("Grace Hopper")
+    display_contacts(page, list_view, db)
+    lock = list_view.data["lock"]
+
+    app_logic.display_search_results(page, list_view, db, "ada", [(ada, "Ada Lovelace", "", "")])
+    assert shown_ids(list_view) == [ada]
+    assert list_view.data["done"] and list_view.data["search_term"] == "ada"
+    assert list_view.data["lock"] is lock
+    assert page.updates[-1] == (list_view,)
@@ -0,0 +1,193 @@
+# test_database.py
+"""Tests for the contact database, run against a temporary file."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from database import (
+    PAGE_SIZE,
+    SEARCH_LIMIT,
+    ConnectionPool,
+    contact_matches_db,
+    delete_contact_db,
+    get_contacts_page_db,
+    init_db,
+    search_contacts_db,
+    update_contact_db,
+)
+
+
+def test_write_commits_or_rolls_back(db, add):
+    """A write() block is one transaction: committed on success, undone on error."""
+    add("Ada Lovelace")
+    with pytest.raises(RuntimeError):
+        with db.write() as conn:
+            conn.execute("INSERT INTO contacts (name) VALUES ('Grace Hopper')")
+            raise RuntimeError("boom")
+    with db.read() as conn:
+        names = [row[0] for row in conn.execute("SELECT name FROM contacts")]
+    assert names == ["Ada Lovelace"]
+
+
+def test_write_takes_the_lock_up_front(db):
+    """BEGIN IMMEDIATE: another connection can't start writing inside a write() block."""
+    other = sqlite3.connect(db.path, timeout=0)
+    try:
+        with db.write():
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+        other.execute("BEGIN IMMEDIATE")
+        other.rollback()
+    finally:
+        other.close()
+
+
+def test_readers_are_read_only(db):
+    with db.read() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO contacts (name) VALUES ('Nobody')")
+
+
+def test_readers_see_committed_data_during_a_write(db, add):
+    """In WAL mode readers neither wait for the writer nor see its uncommitted rows."""
+    add("Ada Lovelace")
+    in_write = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with db.write() as conn:
+            conn.execute("INSERT INTO contacts (name) VALUES ('Grace Hopper')")
+            in_write.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        assert in_write.wait(5)
+        seen = []
+
+        def read():
+            with db.read() as conn:
+                seen.append(conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0])
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join(5)
+        assert seen == [1, 1, 1, 1]
+    finally:
+        release.set()
+        writer.join(5)
+
+    with db.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0] == 2
+
+
+def test_close_closes_borrowed_readers(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), readers=2)
+    with pool.read() as borrowed:
+        with pool.read() as idle:
+            pass
+        pool.close()
+    assert idle is not borrowed
+    for conn in (idle, borrowed):
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            conn.execute("SELECT 1")
+
+
+def search_ids(db, term, **kwargs):
+    return [row[0] for row in search_contacts_db(db, term, **kwargs)]
+
+
+def test_index_follows_inserts_updates_and_deletes(db, add):
+    ada = add("Ada Lovelace", "555-0100", "ada@example.com")
+    assert search_ids(db, "love") == [ada]
+    assert search_ids(db, "example") == [ada]
+    assert search_ids(db, "0100") == [ada]
+
+    update_contact_db(db, ada, "Ada King", "555-0100", "ada@example.com")
+    assert search_ids(db, "love") == []
+    assert search_ids(db, "king") == [ada]
+
+    assert delete_contact_db(db, ada)
+    assert search_ids(db, "king") == []
+    assert not delete_contact_db(db, ada)
+
+
+def test_index_is_built_for_existing_contacts(tmp_path):
+    """Contacts saved before the search index existed are indexed on startup."""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE contacts (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 "name TEXT NOT NULL, phone TEXT, email TEXT)")
+    conn.execute("INSERT INTO contacts (name) VALUES ('Grace Hopper')")
+    conn.commit()
+    conn.close()
+
+    pool = init_db(path)
+    try:
+        assert search_ids(pool, "hop") == [1]
+    finally:
+        pool.close()
+
+
+def test_every_word_must_match_as_a_prefix(db, add):
+    ada = add("Ada Lovelace")
+    add("Ada Byron")
+    assert search_ids(db, "ada lov") == [ada]
+    assert search_ids(db, "lovelace ada") == [ada]
+    assert search_ids(db, "ovelace") == []
+
+
+def test_search_ignores_case_accents_and_punctuation(db, add):
+    jose = add("José O'Brien")
+    assert search_ids(db, "JOSE") == [jose]
+    assert search_ids(db, "o'bri") == [jose]
+    assert search_ids(db, '"') == []
+    assert search_ids(db, "") == []
+
+
+def test_name_matches_rank_first(db, add):
+    by_email = add("Grace Hopper", email="ada@example.com")
+    by_name = add("Ada Lovelace")
+    assert search_ids(db, "ada") == [by_name, by_email]
+
+
+def test_search_limit(db, add):
+    for i in range(SEARCH_LIMIT + 5):
+        add(f"Contact {i}")
+    assert len(search_ids(db, "contact")) == SEARCH_LIMIT
+    assert len(search_ids(db, "contact", limit=3)) == 3
+
+
+def test_contact_matches_db(db, add):
+    ada = add("Ada Lovelace")
+    grace = add("Grace Hopper")
+    assert contact_matches_db(db, ada, "lov")
+    assert not contact_matches_db(db, grace, "lov")
+    assert not contact_matches_db(db, ada, "")
+
+
+def page_ids(db, after_id=0, **kwargs):
+    return [row[0] for row in get_contacts_page_db(db, after_id, **kwargs)]
+
+
+def test_pages_follow_the_last_id(db, add):
+    ids = [add(f"Contact {i}") for i in range(PAGE_SIZE * 2 + 3)]
+    first = page_ids(db)
+    second = page_ids(db, first[-1])
+    third = page_ids(db, second[-1])
+    assert first + second + third == ids
+    assert [len(first), len(second), len(third)] == [PAGE_SIZE, PAGE_SIZE, 3]
+    assert page_ids(db, third[-1]) == []
+
+
+def test_pages_do_not_shift_when_earlier_rows_go(db, add):
+    """Keyset pages start after the last id seen, not at an offset."""
+    ids = [add(f"Contact {i}") for i in range(6)]
+    first = page_ids(db, limit=3)
+    delete_contact_db(db, ids[0])
+    assert page_ids(db, first[-1], limit=3) == ids[3:]
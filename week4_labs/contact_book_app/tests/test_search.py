@@ -0,0 +1,114 @@
+# test_search.py
+"""Tests for the debounced contact search and its in-memory refinement."""
+
+import threading
+
+import pytest
+
+import search
+from database import get_all_contacts_db, search_contacts_db
+from search import ContactSearch, filter_contacts, words
+
+CONTACTS = [
+    ("Ada Lovelace", "555-0100", "ada_lovelace@example.com"),
+    ("José O'Brien", "+1 (555) 010-0199", "jose.obrien@example.org"),
+    ("Jürgen Straße", "", "juergen@strasse.de"),
+    ("Jean-Luc Picard", "555 0101", "jl@enterprise.example"),
+    ("김민준", "010-1234-5678", ""),
+    ("İlkay Ωmega", "", "ilkay@example.tr"),
+    ("Zoë foo_bar", "", "zoe@example.com"),
+    ("Marta Weiß", "", ""),
+]
+
+# Each term is searched after the first word of it, so the results are
+# filtered in memory from the shorter term's complete results
+TERMS = [
+    "ada_l", "ada lov", "jose o'b", "o'brien", "obrien", "jürgen stras",
+    "jurgen straß", "strasse", "jean-luc", "jean l", "luc pic", "555-01",
+    "555 0199", "+1 (555", "김민", "김", "ilk", "ilkay ωm", "zoe foo_b",
+    "zoë bar", "bar_foo", "foo", "example.c", "example com", "ada@exa",
+    "weiß", "weiss", "ma wei",
+]
+
+
+@pytest.fixture
+def contact_search(db, add):
+    for contact in CONTACTS:
+        add(*contact)
+    return ContactSearch(db, on_results=lambda term, contacts: None)
+
+
+def test_words_match_the_index_tokenizer():
+    assert words("foo_bar O'Brien") == ["foo", "bar", "o", "brien"]
+    assert words("Straße JOSÉ") == ["straße", "jose"]
+    assert words("") == [] and words(None) == []
+
+
+@pytest.mark.parametrize("term", TERMS)
+def test_refined_results_match_the_index(contact_search, db, term, monkeypatch):
+    first_word = words(term)[0][:1]
+    contact_search.search(first_word)
+
+    def no_query(*args):
+        raise AssertionError("refinement should not query the database")
+
+    monkeypatch.setattr(search, "search_contacts_db", no_query)
+    refined = contact_search.search(term)
+    expected = search_contacts_db(db, term)
+    assert sorted(refined) == sorted(expected)
+
+
+@pytest.mark.parametrize("term", TERMS + ["기", "김밍", "µ"])
+def test_filter_matches_the_index(contact_search, db, term):
+    """Filtering every contact in memory finds what the FTS query finds."""
+    everyone = get_all_contacts_db(db)
+    assert sorted(filter_contacts(everyone, words(term))) == sorted(search_contacts_db(db, term))
+
+
+def test_filter_contacts_needs_every_word():
+    contacts = [(1, "Ada Lovelace", "", ""), (2, "Ada Byron", "", "ada@lovelace.org")]
+    assert filter_contacts(contacts, ["ada", "lov"]) == contacts
+    assert filter_contacts(contacts, ["byr"]) == [contacts[1]]
+    assert filter_contacts(contacts, ["ovelace"]) == []
+
+
+def test_cache_is_dropped_after_a_write(contact_search, add):
+    assert [c[1] for c in contact_search.search("ada")] == ["Ada Lovelace"]
+    add("Ada Byron")
+    assert sorted(c[1] for c in contact_search.search("ada")) == ["Ada Byron", "Ada Lovelace"]
+
+
+def test_overtaken_search_is_not_rendered(db):
+    rendered = []
+    contact_search = ContactSearch(db, on_results=lambda term, contacts: rendered.append(term))
+    contact_search._run("ada", contact_search._generation)
+    stale = contact_search._generation
+    contact_search.cancel()
+    contact_search._run("ada l", stale)
+    assert rendered == ["ada"]
+
+
+def test_cancel_waits_for_a_render_in_progress(db):
+    """After cancel() returns, a search that already passed its check can't still render."""
+    rendering = threading.Event()
+    release = threading.Event()
+    rendered = []
+
+    def on_results(term, contacts):
+        rendering.set()
+        release.wait(5)
+        rendered.append(term)
+
+    contact_search = ContactSearch(db, on_results=on_results)
+    worker = threading.Thread(target=contact_search._run, args=("ada", contact_search._generation))
+    worker.start()
+    assert rendering.wait(5)
+
+    canceller = threading.Thread(target=contact_search.cancel)
+    canceller.start()
+    canceller.join(0.1)
+    assert canceller.is_alive()
+    release.set()
+    canceller.join(5)
+    worker.join(5)
+    assert rendered == ["ada"]